@@ -0,0 +1,69 @@
+import sys
+import time
+
+from logic import model_check
+from generate import generate_puzzle
+
+# Entailment engines to compare; each takes (knowledge, query, stats)
+ENGINES = {
+    "model_check": model_check,
+}
+
+# (characters, statements) sizes to benchmark
+SIZES = [(2, 2), (3, 4), (4, 6), (5, 8), (6, 10), (7, 12)]
+
+
+def benchmark(engine, n_characters, n_statements, seed=0):
+    """
+    Solve a generated puzzle of the given size with `engine`, querying
+    every knight/knave symbol.
+
+    Return a dict with the elapsed seconds, the nodes and models explored,
+    and whether the entailed symbols match the hidden solution.
+    """
+    knowledge, symbols, solution, _ = generate_puzzle(
+        n_characters, n_statements, seed=seed
+    )
+    stats = {"nodes": 0, "models": 0}
+    entailed = dict()
+    start = time.perf_counter()
+    for name, (knight, knave) in symbols.items():
+        if engine(knowledge, knight, stats):
+            entailed[name] = True
+        elif engine(knowledge, knave, stats):
+            entailed[name] = False
+    elapsed = time.perf_counter() - start
+
+    # Entailed kinds must agree with the solution the puzzle was built from
+    correct = all(solution[name] == kind for name, kind in entailed.items())
+    return {
+        "seconds": elapsed,
+        "nodes": stats["nodes"],
+        "models": stats["models"],
+        "solved": len(entailed),
+        "correct": correct,
+    }
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python benchmark.py [max_characters]")
+    max_characters = int(sys.argv[1]) if len(sys.argv) == 2 else None
+    sizes = [
+        size for size in SIZES
+        if max_characters is None or size[0] <= max_characters
+    ]
+
+    print(f"{'engine':<12} {'chars':>5} {'stmts':>5} {'seconds':>9} "
+          f"{'nodes':>10} {'models':>10} {'solved':>6} {'correct':>7}")
+    for name, engine in ENGINES.items():
+        for n_characters, n_statements in sizes:
+            result = benchmark(engine, n_characters, n_statements)
+            print(f"{name:<12} {n_characters:>5} {n_statements:>5} "
+                  f"{result['seconds']:>9.4f} {result['nodes']:>10} "
+                  f"{result['models']:>10} {result['solved']:>6} "
+                  f"{str(result['correct']):>7}")
+
+
+if __name__ == "__main__":
+    main()
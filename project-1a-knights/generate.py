@@ -0,0 +1,114 @@
+import random
+import string
+
+from logic import *
+
+
+def character_names(n):
+    """
+    Return `n` character names: "A" to "Z", then "A1", "B1", ...
+    """
+    letters = string.ascii_uppercase
+    names = []
+    for i in range(n):
+        suffix = "" if i < len(letters) else str(i // len(letters))
+        names.append(letters[i % len(letters)] + suffix)
+    return names
+
+
+def character_symbols(names):
+    """
+    Return a dict mapping each name to its (knight, knave) symbol pair,
+    named the same way as the symbols in puzzle.py.
+    """
+    return {
+        name: (Symbol(f"{name} is a Knight"), Symbol(f"{name} is a Knave"))
+        for name in names
+    }
+
+
+def random_claim(symbols, names, rng):
+    """
+    Return a random claim about one or two characters, as a tuple
+    (text, sentence). Claims use the same shapes as the hand-written
+    puzzles: "X is a knight/knave", "X and Y are the same/different kinds",
+    and "X or Y is a knave".
+    """
+    if len(names) > 1:
+        x, y = rng.sample(names, 2)
+    else:
+        x = y = names[0]
+    x_knight, x_knave = symbols[x]
+    y_knight, y_knave = symbols[y]
+    kind = rng.randrange(5)
+    if kind == 0:
+        return f"{x} is a knight.", x_knight
+    elif kind == 1:
+        return f"{x} is a knave.", x_knave
+    elif kind == 2:
+        return (f"{x} and {y} are the same kind.",
+                Or(And(x_knight, y_knight), And(x_knave, y_knave)))
+    elif kind == 3:
+        return (f"{x} and {y} are of different kinds.",
+                Or(And(x_knight, y_knave), And(x_knave, y_knight)))
+    else:
+        return f"{x} or {y} is a knave.", Or(x_knave, y_knave)
+
+
+def generate_puzzle(n_characters, n_statements, seed=None):
+    """
+    Generate a random consistent knights-and-knaves puzzle.
+
+    A hidden solution is drawn first, and each statement is only kept if
+    its truth matches the speaker's kind in that solution, so the
+    resulting knowledge base is always satisfiable.
+
+    Return a tuple (knowledge, symbols, solution, statements) where
+    `symbols` maps each name to its (knight, knave) symbols, `solution`
+    maps each name to True for knights and False for knaves, and
+    `statements` is a list of (speaker, text) pairs.
+    """
+    rng = random.Random(seed)
+    names = character_names(n_characters)
+    symbols = character_symbols(names)
+    solution = {name: rng.random() < 0.5 for name in names}
+    model = dict()
+    for name in names:
+        knight, knave = symbols[name]
+        model[knight.name] = solution[name]
+        model[knave.name] = not solution[name]
+
+    # Problem setting/structure
+    knowledge = And()
+    for name in names:
+        knight, knave = symbols[name]
+        knowledge.add(Or(knight, knave))
+        knowledge.add(Not(And(knight, knave)))
+
+    # Knowledge from character(s)
+    statements = []
+    while len(statements) < n_statements:
+        speaker = rng.choice(names)
+        text, claim = random_claim(symbols, names, rng)
+        if claim.evaluate(model) != solution[speaker]:
+            continue
+        knight, knave = symbols[speaker]
+        knowledge.add(Implication(knight, claim))
+        knowledge.add(Implication(knave, Not(claim)))
+        statements.append((speaker, text))
+
+    return knowledge, symbols, solution, statements
+
+
+def main():
+    knowledge, symbols, solution, statements = generate_puzzle(3, 4)
+    for speaker, text in statements:
+        print(f"{speaker} says \"{text}\"")
+    for name, (knight, knave) in symbols.items():
+        for symbol in (knight, knave):
+            if model_check(knowledge, symbol):
+                print(f"    {symbol}")
+
+
+if __name__ == "__main__":
+    main()
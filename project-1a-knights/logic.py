@@ -225,14 +225,22 @@ class Biconditional(Sentence):
         return set.union(self.left.symbols(), self.right.symbols())
 
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+def model_check(knowledge, query, stats=None):
+    """Checks if knowledge base entails query.
+
+    If `stats` is a dict, the number of search nodes visited and complete
+    models evaluated are added to its "nodes" and "models" counters.
+    """
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
+        if stats is not None:
+            stats["nodes"] = stats.get("nodes", 0) + 1
 
         # If model has an assignment for each symbol
         if not symbols:
+            if stats is not None:
+                stats["models"] = stats.get("models", 0) + 1
 
             # If knowledge base is true in model, then query must also be true
             if knowledge.evaluate(model):
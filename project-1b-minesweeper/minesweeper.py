@@ -1,5 +1,12 @@
 import itertools
+import math
 import random
+import time
+
+import numpy as np
+
+# Assignments a density estimate stands for when counting times out
+DENSITY_SCALE = 1 << 20
 
 
 class Minesweeper():
@@ -12,26 +19,28 @@ class Minesweeper():
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
 
-        # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
-
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
-
-        # At first, player has found no mines
+        # Sample distinct mine positions without replacement
+        positions = random.sample(range(height * width), mines)
+        self.mines = set(divmod(position, width) for position in positions)
+
+        # Initialize a boolean field with the mines set
+        self.board = np.zeros(height * width, dtype=bool)
+        self.board[positions] = True
+        self.board = self.board.reshape(height, width)
+
+        # Precompute every cell's count of neighboring mines by summing
+        # the 3x3 window around it on a zero-padded copy of the field
+        padded = np.pad(self.board.astype(np.uint8), 1)
+        self.counts = np.zeros((height, width), dtype=np.uint8)
+        for di in range(3):
+            for dj in range(3):
+                if (di, dj) != (1, 1):
+                    self.counts += padded[di:di + height, dj:dj + width]
+
+        # At first, player has found no mines and revealed no cells
         self.mines_found = set()
+        self.revealed = set()
 
     def print(self):
         """
@@ -50,7 +59,7 @@ class Minesweeper():
 
     def is_mine(self, cell):
         i, j = cell
-        return self.board[i][j]
+        return bool(self.board[i, j])
 
     def nearby_mines(self, cell):
         """
@@ -58,24 +67,35 @@ class Minesweeper():
         within one row and column of a given cell,
         not including the cell itself.
         """
+        i, j = cell
+        return int(self.counts[i, j])
 
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
+    def reveal(self, cell):
+        """
+        Reveals a cell that is not a mine. If it has no nearby mines, its
+        neighbors are revealed too, flood-filling the whole region of zero
+        cells and its border.
 
-        return count
+        Returns a list of (cell, count) pairs for every newly revealed cell,
+        where count is the number of nearby mines.
+        """
+        if cell in self.revealed:
+            return []
+        self.revealed.add(cell)
+        revealed = []
+        frontier = [cell]
+        while frontier:
+            i, j = frontier.pop()
+            count = int(self.counts[i, j])
+            revealed.append(((i, j), count))
+            if count != 0:
+                continue
+            for ni in range(max(i - 1, 0), min(i + 2, self.height)):
+                for nj in range(max(j - 1, 0), min(j + 2, self.width)):
+                    if (ni, nj) not in self.revealed:
+                        self.revealed.add((ni, nj))
+                        frontier.append((ni, nj))
+        return revealed
 
     def won(self):
         """
@@ -98,9 +118,27 @@ class Sentence():
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
 
+    def __hash__(self):
+        # Only hashed while stored in the AI's knowledge base, which removes
+        # a sentence before mutating it and re-adds it afterwards
+        return hash((frozenset(self.cells), self.count))
+
     def __str__(self):
         return f"{self.cells} = {self.count}"
 
+    def is_proper_subset(self, other):
+        """
+        Returns True if self.cells is a proper subset of other.cells.
+        """
+        return self.cells < other.cells
+
+    def difference(self, other):
+        """
+        Returns the sentence inferred from `other` being a subset of self:
+        the remaining cells contain the remaining number of mines.
+        """
+        return Sentence(self.cells - other.cells, self.count - other.count)
+
     def known_mines(self):
         """
         Returns the set of all cells in self.cells known to be mines.
@@ -139,17 +177,121 @@ class Sentence():
         # raise NotImplementedError
 
 
+class BitSentence():
+    """
+    Sentence whose cells are stored as an integer bitmask, with bit
+    i * width + j set for cell (i, j), so that subset tests, differences
+    and hashing are single integer operations. The decoded cells are
+    cached until the mask changes.
+    """
+
+    __slots__ = ("mask", "count", "width", "decoded")
+
+    def __init__(self, cells, count, width):
+        self.mask = 0
+        for i, j in cells:
+            self.mask |= 1 << (i * width + j)
+        self.count = count
+        self.width = width
+        self.decoded = None
+
+    @classmethod
+    def from_mask(cls, mask, count, width):
+        sentence = cls((), count, width)
+        sentence.mask = mask
+        return sentence
+
+    @property
+    def cells(self):
+        """
+        The set of cells in the sentence, decoded from the bitmask.
+        """
+        if self.decoded is None:
+            self.decoded = set()
+            mask = self.mask
+            while mask:
+                low = mask & -mask
+                self.decoded.add(divmod(low.bit_length() - 1, self.width))
+                mask ^= low
+        return self.decoded
+
+    def __eq__(self, other):
+        if not isinstance(other, BitSentence):
+            return NotImplemented
+        return self.mask == other.mask and self.count == other.count
+
+    def __hash__(self):
+        return hash((self.mask, self.count))
+
+    def __str__(self):
+        return f"{self.cells} = {self.count}"
+
+    def is_proper_subset(self, other):
+        return self.mask != other.mask and self.mask & other.mask == self.mask
+
+    def difference(self, other):
+        return BitSentence.from_mask(
+            self.mask & ~other.mask, self.count - other.count, self.width
+        )
+
+    def known_mines(self):
+        if self.mask.bit_count() == self.count:
+            return self.cells
+        return None
+
+    def known_safes(self):
+        if self.count == 0:
+            return self.cells
+        return None
+
+    def mark_known(self, mines, safes):
+        """
+        Removes the cells in the board masks `mines` and `safes` from the
+        sentence, taking the mines out of its count.
+        """
+        known = self.mask & (mines | safes)
+        if known:
+            self.count -= (known & mines).bit_count()
+            self.mask &= ~known
+            self.decoded = None
+
+    def mark_mine(self, cell):
+        bit = 1 << (cell[0] * self.width + cell[1])
+        if self.mask & bit:
+            self.mask ^= bit
+            self.count -= 1
+            self.decoded = None
+
+    def mark_safe(self, cell):
+        bit = 1 << (cell[0] * self.width + cell[1])
+        if self.mask & bit:
+            self.mask ^= bit
+            self.decoded = None
+
+
 class MinesweeperAI():
     """
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, total_mines=None, time_limit=0.5,
+                 bitsets=False):
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Total number of mines on the board, if known, and the number of
+        # seconds make_random_move may spend counting mine assignments
+        self.total_mines = total_mines
+        self.time_limit = time_limit
+
+        # Cached mine-count tables for frontier components
+        self.component_cache = dict()
+
+        # Whether sentences store their cells as bitmasks
+        self.bitsets = bitsets
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -157,26 +299,107 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # The same cells as board bitmasks, for filtering bitset sentences
+        self.mines_mask = 0
+        self.safes_mask = 0
+
+        # Set of sentences about the game known to be true
+        self.knowledge = set()
+
+        # Map each cell to the sentences in knowledge that mention it
+        self.index = dict()
+
+        # Sentences that are new or changed and still need inference
+        self.worklist = []
+
+        # Seconds spent in each call to add_knowledge
+        self.latencies = []
+
+    def new_sentence(self, cells, count):
+        """
+        Returns a sentence of the kind this AI stores.
+        """
+        if self.bitsets:
+            return BitSentence(cells, count, self.width)
+        return Sentence(cells, count)
+
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base, after removing any cells
+        already known to be mines or safe. Empty and duplicate sentences
+        are dropped. Returns True if the sentence was added.
+        """
+        if self.bitsets:
+            sentence.mark_known(self.mines_mask, self.safes_mask)
+            if not sentence.mask or sentence in self.knowledge:
+                return False
+        else:
+            for cell in list(sentence.cells):
+                if cell in self.mines:
+                    sentence.mark_mine(cell)
+                elif cell in self.safes:
+                    sentence.mark_safe(cell)
+            if not sentence.cells or sentence in self.knowledge:
+                return False
+        self.knowledge.add(sentence)
+        for cell in sentence.cells:
+            self.index.setdefault(cell, set()).add(sentence)
+        self.worklist.append(sentence)
+        return True
+
+    def remove_sentence(self, sentence):
+        """
+        Removes a sentence from the knowledge base and the cell index.
+        """
+        self.knowledge.discard(sentence)
+        for cell in sentence.cells:
+            sentences = self.index.get(cell)
+            if sentences is not None:
+                sentences.discard(sentence)
+                if not sentences:
+                    del self.index[cell]
 
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
+        if cell in self.mines:
+            return
         self.mines.add(cell)
-        for sentence in self.knowledge:
+        self.mines_mask |= 1 << (cell[0] * self.width + cell[1])
+        for sentence in list(self.index.get(cell, ())):
+            self.remove_sentence(sentence)
             sentence.mark_mine(cell)
+            self.add_sentence(sentence)
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
+        if cell in self.safes:
+            return
         self.safes.add(cell)
-        for sentence in self.knowledge:
+        self.safes_mask |= 1 << (cell[0] * self.width + cell[1])
+        for sentence in list(self.index.get(cell, ())):
+            self.remove_sentence(sentence)
             sentence.mark_safe(cell)
+            self.add_sentence(sentence)
+
+    def neighbors(self, cell):
+        """
+        Returns the set of cells within one row and column of `cell`
+        that are on the board, not including the cell itself.
+        """
+        neighboring_cells = set()
+        for i in range(cell[0] - 1, cell[0] + 2):
+            for j in range(cell[1] - 1, cell[1] + 2):
+                if (i, j) == cell:
+                    continue
+                if 0 <= i < self.height and 0 <= j < self.width:
+                    neighboring_cells.add((i, j))
+        return neighboring_cells
 
     def add_knowledge(self, cell, count):
         """
@@ -193,101 +416,70 @@ class MinesweeperAI():
             5) add any new sentences to the AI's knowledge base
                if they can be inferred from existing knowledge
         """
+        self.add_knowledge_many([(cell, count)])
+
+    def add_knowledge_many(self, revealed):
+        """
+        Adds knowledge for many revealed cells at once, given as an
+        iterable of (cell, count) pairs such as Minesweeper.reveal returns.
+
+        Every cell is marked as a move made and as safe before any new
+        sentence is added, and inference runs once at the end.
+        """
+        start = time.perf_counter()
+        revealed = list(revealed)
+
         # step 1), 2)
-        self.moves_made.add(cell)
-        self.safes.add(cell)
+        for cell, _ in revealed:
+            self.moves_made.add(cell)
+            self.mark_safe(cell)
 
         # step 3)
-        neighboring_cells = set()
-        for i in range(-1,2):
-            for j in range(-1,2):
-                n_i = cell[0]+i
-                n_j = cell[1]+j
-                if n_i>=0 and n_i<self.height and n_j>=0 and n_j<self.width and not(i==0 and j==0):
-                    neighboring_cells.add((n_i, n_j))
-        new_sentence = Sentence(neighboring_cells, count)
-        self.knowledge.append(new_sentence)
-
-        # step 4)
-
-        # to_mark = set()
-        # for sentence in self.knowledge:
-        #     if sentence.known_mines() is not None:
-        #         to_mark = to_mark | sentence.known_mines()
-        # for cell in to_mark:
-        #     self.mark_mine(cell)
-        
-        # to_mark = set()
-        # for sentence in self.knowledge:
-        #     if sentence.known_safes() is not None:
-        #         to_mark = to_mark | sentence.known_safes()
-        # for cell in to_mark:
-        #     self.mark_safe(cell)
-        while True:
-            updated_mark = False
-            updated_infer = False
-            while True:
-                # find cells that can be marked as mine/safe
-                to_mark_mine = set()
-                to_mark_safe = set()
-                for sentence in self.knowledge:
-                    if sentence.known_mines() is not None:
-                        to_mark_mine = to_mark_mine | sentence.known_mines()
-                    elif sentence.known_safes() is not None:
-                        to_mark_safe = to_mark_safe | sentence.known_safes()
-                # end the loop when there's nothing to update
-                if len(to_mark_mine) == 0 and len(to_mark_safe) == 0:
-                    break
-                else:
-                    updated_mark = True
-                    # mark as mine/safe
-                    if len(to_mark_mine) > 0:
-                        for cell in to_mark_mine:
-                            self.mark_mine(cell)
-                    if len(to_mark_safe) > 0:
-                        for cell in to_mark_safe:
-                            self.mark_safe(cell)
+        for cell, count in revealed:
+            self.add_sentence(self.new_sentence(self.neighbors(cell), count))
 
-            # step 5)
-            while True:
-                new_sentences = []
-                for s1 in self.knowledge:
-                    for s2 in self.knowledge:
-                        if s1.cells < s2.cells:
-                            new_sentence = Sentence(s2.cells-s1.cells, s2.count-s1.count)
-                            if new_sentence not in self.knowledge:
-                                new_sentences.append(new_sentence)
-                if len(new_sentences) == 0:
-                    break
-                updated_infer = True
-                self.knowledge = self.knowledge + new_sentences
-            
-            if not(updated_mark or updated_infer):
-                break
-
-            # for sentence in self.knowledge:
-            #     if sentence.known_mines() is not None:
-            #         for cell in sentence.known_mines():
-            #             self.mark_mine(cell)
-            #     if sentence.known_safes() is not None:
-            #         for cell in sentence.known_safes():
-            #             self.mark_safe(cell)
-
-            # to_mark = set()
-            # for sentence in self.knowledge:
-            #     if sentence.known_mines() is not None:
-            #         to_mark = to_mark | sentence.known_mines()
-            # for cell in to_mark:
-            #     self.mark_mine(cell)
-            
-            # to_mark = set()
-            # for sentence in self.knowledge:
-            #     if sentence.known_safes() is not None:
-            #         to_mark = to_mark | sentence.known_safes()
-            # for cell in to_mark:
-            #     self.mark_safe(cell)
+        # step 4), 5)
+        self.infer()
 
-        # raise NotImplementedError
+        self.latencies.append(time.perf_counter() - start)
+
+    def infer(self):
+        """
+        Runs inference until no sentence on the worklist changes anything.
+
+        A sentence is only compared with the sentences that share a cell
+        with it, found through the cell index, since a subset relation
+        between two non-empty sentences requires a shared cell.
+        """
+        while self.worklist:
+            sentence = self.worklist.pop()
+
+            # Skip sentences that were dropped or changed since queued
+            if sentence not in self.knowledge:
+                continue
+
+            # step 4)
+            mines = sentence.known_mines()
+            if mines:
+                for cell in list(mines):
+                    self.mark_mine(cell)
+                continue
+            safes = sentence.known_safes()
+            if safes:
+                for cell in list(safes):
+                    self.mark_safe(cell)
+                continue
+
+            # step 5)
+            related = set()
+            for cell in sentence.cells:
+                related.update(self.index[cell])
+            related.discard(sentence)
+            for other in related:
+                if sentence.is_proper_subset(other):
+                    self.add_sentence(other.difference(sentence))
+                elif other.is_proper_subset(sentence):
+                    self.add_sentence(sentence.difference(other))
 
     def make_safe_move(self):
         """
@@ -307,14 +499,251 @@ class MinesweeperAI():
     def make_random_move(self):
         """
         Returns a move to make on the Minesweeper board.
-        Should choose randomly among cells that:
+        Should choose among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
+        picking the cell least likely to be a mine, at random among ties.
         """
         if len(self.moves_made) + len(self.mines) == self.height*self.width:
             return None
-        
-        all_cells = [(i, j) for i in range(self.height) for j in range(self.width)]
-        choosable_cells = set(all_cells) - self.mines - self.moves_made
-        return choosable_cells.pop()
-        # raise NotImplementedError
+
+        probabilities = self.mine_probabilities()
+        lowest = min(probabilities.values())
+        return random.choice(sorted(
+            cell for cell, p in probabilities.items() if p == lowest
+        ))
+
+    def mine_probabilities(self):
+        """
+        Returns a dict mapping every cell that has not been chosen and is
+        not known to be a mine to the probability that it is a mine.
+
+        Cells mentioned in the knowledge base are split into components
+        of sentences sharing cells. Each component's consistent mine
+        assignments are counted by number of mines, and the components are
+        combined with the remaining, unconstrained cells through the total
+        mine count. Without a known total, components are treated as
+        independent and unconstrained cells get the average frontier
+        probability.
+        """
+        deadline = time.perf_counter() + self.time_limit
+        choosable_cells = set(
+            (i, j) for i in range(self.height) for j in range(self.width)
+        ) - self.mines - self.moves_made
+
+        # Count assignments of each component, reusing cached counts
+        cache = dict()
+        components = []
+        for sentences in self.components():
+            key = frozenset(
+                (frozenset(sentence.cells), sentence.count)
+                for sentence in sentences
+            )
+            if key in self.component_cache:
+                table = self.component_cache[key]
+            else:
+                table = count_assignments(sentences, deadline)
+            if time.perf_counter() <= deadline:
+                cache[key] = table
+            components.append(table)
+        self.component_cache = cache
+
+        frontier = set()
+        for cells, _, _ in components:
+            frontier.update(cells)
+        unconstrained = choosable_cells - frontier - self.safes
+
+        # Weight of each total number of frontier mines, given the rest
+        # must fit into the unconstrained cells
+        remaining = (None if self.total_mines is None
+                     else self.total_mines - len(self.mines))
+
+        def weight(k):
+            if remaining is None:
+                return 1
+            if 0 <= remaining - k <= len(unconstrained):
+                return math.comb(len(unconstrained), remaining - k)
+            return 0
+
+        probabilities = {cell: 0 for cell in choosable_cells & self.safes}
+        polynomials = [counts for _, counts, _ in components]
+        for index, (cells, counts, mine_counts) in enumerate(components):
+            others = {0: 1}
+            for other in polynomials[:index] + polynomials[index + 1:]:
+                others = convolve(others, other)
+            if remaining is None:
+                others = {0: sum(others.values())}
+            total = 0
+            cell_totals = [0] * len(cells)
+            for k, count in counts.items():
+                w = sum(n * weight(k + j) for j, n in others.items())
+                total += count * w
+                for position, n in enumerate(mine_counts[k]):
+                    cell_totals[position] += n * w
+            for cell, n in zip(cells, cell_totals):
+                probabilities[cell] = n / total if total else 0.5
+
+        if unconstrained:
+            if remaining is None:
+                frontier_probabilities = [probabilities[c] for c in frontier]
+                p = (sum(frontier_probabilities) / len(frontier_probabilities)
+                     if frontier_probabilities else 0.5)
+            else:
+                combined = {0: 1}
+                for polynomial in polynomials:
+                    combined = convolve(combined, polynomial)
+                total = sum(n * weight(k) for k, n in combined.items())
+                expected = sum(
+                    n * weight(k) * (remaining - k)
+                    for k, n in combined.items()
+                )
+                p = (expected / total / len(unconstrained)
+                     if total else 0.5)
+            for cell in unconstrained:
+                probabilities[cell] = p
+
+        return probabilities
+
+    def components(self):
+        """
+        Returns a list of lists of sentences, where the sentences in each
+        list are connected to one another through shared cells.
+        """
+        components = []
+        seen = set()
+        for sentence in self.knowledge:
+            if sentence in seen:
+                continue
+            seen.add(sentence)
+            component = []
+            stack = [sentence]
+            while stack:
+                current = stack.pop()
+                component.append(current)
+                for cell in current.cells:
+                    for other in self.index[cell]:
+                        if other not in seen:
+                            seen.add(other)
+                            stack.append(other)
+            components.append(component)
+        return components
+
+
+def convolve(a, b):
+    """
+    Returns the product of two polynomials given as dicts mapping a
+    number of mines to a number of assignments.
+    """
+    product = dict()
+    for i, x in a.items():
+        for j, y in b.items():
+            product[i + j] = product.get(i + j, 0) + x * y
+    return product
+
+
+def count_assignments(sentences, deadline):
+    """
+    Counts the mine assignments of the cells in `sentences` that satisfy
+    every sentence.
+
+    Returns a tuple (cells, counts, mine_counts) where `counts` maps each
+    number of mines k to the number of assignments with k mines, and
+    `mine_counts[k][i]` is how many of those have a mine in `cells[i]`.
+
+    If counting runs past `deadline`, each cell is instead given the
+    average density of the sentences it appears in, as DENSITY_SCALE
+    assignments with the density scaled to a whole number of mines, so
+    that the counts stay integers however large the weights combined
+    with them get.
+    """
+    # Order cells so that neighboring cells are assigned one after another
+    constraints = [(list(sentence.cells), sentence.count)
+                   for sentence in sentences]
+    cells = []
+    position = dict()
+    for constraint_cells, _ in constraints:
+        for cell in sorted(constraint_cells):
+            if cell not in position:
+                position[cell] = len(cells)
+                cells.append(cell)
+    cell_constraints = [[] for _ in cells]
+    for c, (constraint_cells, _) in enumerate(constraints):
+        for cell in constraint_cells:
+            cell_constraints[position[cell]].append(c)
+
+    mines = [0] * len(constraints)
+    unassigned = [len(constraint_cells) for constraint_cells, _ in constraints]
+    counts = dict()
+    mine_counts = dict()
+    nodes = 0
+
+    def assign(i, value):
+        """
+        Adds `value` mines at cells[i] to the constraints on that cell and
+        returns whether they can all still be met.
+        """
+        consistent = True
+        for c in cell_constraints[i]:
+            mines[c] += value
+            unassigned[c] -= 1
+            count = constraints[c][1]
+            if mines[c] > count or mines[c] + unassigned[c] < count:
+                consistent = False
+        return consistent
+
+    def unassign(i, value):
+        for c in cell_constraints[i]:
+            mines[c] -= value
+            unassigned[c] += 1
+
+    # Depth-first search with an explicit stack, since frontiers can be
+    # far longer than the recursion limit: assignment[i] is the value
+    # being tried at cells[i], or -1 when cells[i] is not yet assigned
+    assignment = [-1] * len(cells)
+    i = 0
+    k = 0
+    try:
+        while i >= 0:
+            nodes += 1
+            if nodes % 1024 == 0 and time.perf_counter() > deadline:
+                raise TimeoutError
+            if i == len(cells):
+                counts[k] = counts.get(k, 0) + 1
+                if k not in mine_counts:
+                    mine_counts[k] = [0] * len(cells)
+                for j, value in enumerate(assignment):
+                    mine_counts[k][j] += value
+                i -= 1
+                continue
+
+            value = assignment[i]
+            if value >= 0:
+                unassign(i, value)
+                k -= value
+            for value in range(value + 1, 2):
+                if assign(i, value):
+                    break
+                unassign(i, value)
+            else:
+                assignment[i] = -1
+                i -= 1
+                continue
+            assignment[i] = value
+            k += value
+            i += 1
+    except TimeoutError:
+        densities = [0] * len(cells)
+        for c in range(len(constraints)):
+            constraint_cells, count = constraints[c]
+            for cell in constraint_cells:
+                densities[position[cell]] += count / len(constraint_cells)
+        densities = [
+            density / len(cell_constraints[i])
+            for i, density in enumerate(densities)
+        ]
+        k = round(sum(densities))
+        return cells, {k: DENSITY_SCALE}, {
+            k: [round(density * DENSITY_SCALE) for density in densities]
+        }
+
+    return cells, counts, mine_counts
@@ -0,0 +1,151 @@
+import argparse
+import multiprocessing
+import random
+import time
+import tracemalloc
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+# Beginner, intermediate and expert boards as (height, width, mines)
+BOARDS = [(8, 8, 10), (16, 16, 40), (16, 30, 99)]
+
+
+def play(height, width, mines, seed, bitsets=False, memory=False):
+    """
+    Play one headless game of Minesweeper with MinesweeperAI, storing
+    sentences as bitmasks if `bitsets` is true.
+
+    The global random module is seeded with `seed`, so a game is
+    reproducible no matter which process plays it.
+
+    Return a dict with whether the game was won, the number of moves made,
+    the seconds spent playing and in add_knowledge, and, if `memory` is
+    true, the peak bytes allocated during the game.
+    """
+    random.seed(seed)
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, total_mines=mines,
+                       bitsets=bitsets)
+
+    won = False
+    moves = 0
+    while True:
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            if move is None:
+                game.mines_found = ai.mines.copy()
+                won = game.won()
+                break
+        moves += 1
+        if game.is_mine(move):
+            break
+        ai.add_knowledge_many(game.reveal(move))
+
+    seconds = time.perf_counter() - start
+    peak = 0
+    if memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "won": won,
+        "moves": moves,
+        "seconds": seconds,
+        "inference": sum(ai.latencies),
+        "peak": peak,
+    }
+
+
+def play_args(args):
+    return play(*args)
+
+
+def simulate(height, width, mines, games, seed=0, processes=None,
+             bitsets=False, memory=False):
+    """
+    Play `games` games on a board of the given size across a pool of
+    `processes` worker processes (all CPUs by default). Game i is played
+    with seed `seed + i`.
+
+    Return a dict summarizing win rate, throughput, inference time and
+    the largest peak memory of any game.
+    """
+    tasks = [
+        (height, width, mines, seed + i, bitsets, memory)
+        for i in range(games)
+    ]
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.map(play_args, tasks, chunksize=max(1, games // 64))
+    elapsed = time.perf_counter() - start
+
+    moves = sum(result["moves"] for result in results)
+    playing = sum(result["seconds"] for result in results)
+    inference = sum(result["inference"] for result in results)
+    return {
+        "win_rate": sum(result["won"] for result in results) / games,
+        "moves": moves,
+        "elapsed": elapsed,
+        "moves_per_second": moves / elapsed,
+        "inference_share": inference / playing if playing else 0,
+        "inference_per_move": inference / moves if moves else 0,
+        "peak": max(result["peak"] for result in results),
+    }
+
+
+def parse_board(text):
+    """
+    Parse a board given as "HEIGHTxWIDTHxMINES", e.g. "16x30x99".
+    """
+    try:
+        height, width, mines = (int(n) for n in text.split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid board {text!r}")
+    if mines >= height * width:
+        raise argparse.ArgumentTypeError(f"too many mines in {text!r}")
+    return height, width, mines
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play many headless Minesweeper games with the AI."
+    )
+    parser.add_argument("-n", "--games", type=int, default=1000,
+                        help="games per board (default 1000)")
+    parser.add_argument("-b", "--board", type=parse_board, action="append",
+                        help="board as HEIGHTxWIDTHxMINES, may be repeated")
+    parser.add_argument("-p", "--processes", type=int, default=None,
+                        help="worker processes (default: all CPUs)")
+    parser.add_argument("-s", "--seed", type=int, default=0,
+                        help="seed of the first game (default 0)")
+    parser.add_argument("--sentences", choices=["set", "bitset", "both"],
+                        default="set",
+                        help="how sentences store their cells (default set)")
+    parser.add_argument("--memory", action="store_true",
+                        help="trace peak memory per game (slower)")
+    args = parser.parse_args()
+
+    kinds = ["set", "bitset"] if args.sentences == "both" else [args.sentences]
+    print(f"{'board':>10} {'kind':>6} {'games':>6} {'win rate':>9} "
+          f"{'moves/s':>9} {'ms/infer':>9} {'infer %':>8} {'peak KB':>8} "
+          f"{'seconds':>8}")
+    for height, width, mines in args.board or BOARDS:
+        for kind in kinds:
+            summary = simulate(height, width, mines, args.games,
+                               seed=args.seed, processes=args.processes,
+                               bitsets=kind == "bitset", memory=args.memory)
+            board = f"{height}x{width}x{mines}"
+            print(f"{board:>10} {kind:>6} {args.games:>6} "
+                  f"{100 * summary['win_rate']:>8.1f}% "
+                  f"{summary['moves_per_second']:>9.0f} "
+                  f"{1000 * summary['inference_per_move']:>9.3f} "
+                  f"{100 * summary['inference_share']:>7.1f}% "
+                  f"{summary['peak'] / 1024:>8.0f} "
+                  f"{summary['elapsed']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from generate import GRAPHS, page_names, write_corpus
+from outofcore import memmap_pagerank, write_edges
+from pagerank import (DAMPING, crawl, iterate_pagerank, power_iteration,
+                      sample_pagerank, transition_matrix)
+from solvers import extrapolated
+
+SIZES = [10 ** 3, 10 ** 4, 10 ** 5]
+
+# Largest graphs to write as HTML, and to convert into a corpus dict
+HTML_LIMIT = 10 ** 4
+CORPUS_LIMIT = 10 ** 6
+
+
+def measure(function, *args, **kwargs):
+    """
+    Call `function` and return a tuple (result, seconds, peak bytes
+    allocated during the call).
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def as_vector(ranks, n_pages):
+    """
+    Return a rank dict keyed by generated page names as an array.
+    """
+    vector = np.zeros(n_pages)
+    for page, rank in ranks.items():
+        vector[int(page[:-len(".html")])] = rank
+    return vector
+
+
+def benchmark(kind, n_pages, links_per_page, seed, workdir):
+    """
+    Generate a graph and time every PageRank engine on it.
+    Return a list of (engine, seconds, peak bytes, L1 error) tuples, with
+    errors measured against a tightly converged power iteration.
+    """
+    sources, targets = GRAPHS[kind](n_pages, links_per_page, seed=seed)
+    matrix, dangling = transition_matrix(sources, targets, n_pages)
+    reference = power_iteration(matrix, dangling, DAMPING, tolerance=1e-12)
+    results = []
+
+    def record(engine, vector, seconds, peak):
+        error = np.abs(vector - reference).sum()
+        results.append((engine, seconds, peak, error))
+
+    if n_pages <= HTML_LIMIT:
+        directory = os.path.join(workdir, "corpus")
+        write_corpus(directory, sources, targets, n_pages)
+        corpus, seconds, peak = measure(crawl, directory)
+        shutil.rmtree(directory)
+        results.append(("crawl", seconds, peak, float("nan")))
+    elif n_pages <= CORPUS_LIMIT:
+        names = page_names(n_pages)
+        bounds = np.searchsorted(sources, np.arange(n_pages + 1))
+        corpus = {
+            name: set(names[j] for j in
+                      targets[bounds[i]:bounds[i + 1]].tolist())
+            for i, name in enumerate(names)
+        }
+    else:
+        corpus = None
+
+    if corpus is not None:
+        ranks, seconds, peak = measure(
+            sample_pagerank, corpus, DAMPING, 10 * n_pages, seed=seed
+        )
+        record("sample_pagerank", as_vector(ranks, n_pages), seconds, peak)
+        ranks, seconds, peak = measure(iterate_pagerank, corpus, DAMPING)
+        record("iterate_pagerank", as_vector(ranks, n_pages), seconds, peak)
+        del corpus
+
+    rank, seconds, peak = measure(power_iteration, matrix, dangling, DAMPING)
+    record("power_iteration", rank, seconds, peak)
+    (rank, _), seconds, peak = measure(extrapolated, matrix, dangling, DAMPING)
+    record("quadratic", rank, seconds, peak)
+
+    path = os.path.join(workdir, "graph.edges")
+    write_edges(path, sources, targets, n_pages)
+    rank, seconds, peak = measure(memmap_pagerank, path, DAMPING)
+    record("memmap_pagerank", rank, seconds, peak)
+    os.remove(path)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark PageRank engines on synthetic graphs."
+    )
+    parser.add_argument("--kind", choices=sorted(GRAPHS), default="scale-free")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                        help="numbers of pages (default 10^3 to 10^5)")
+    parser.add_argument("--links", type=int, default=10,
+                        help="average links per page (default 10)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'pages':>9} {'engine':<17} {'seconds':>9} {'peak MB':>9} "
+          f"{'L1 error':>9}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_pages in args.sizes:
+            for engine, seconds, peak, error in benchmark(
+                args.kind, n_pages, args.links, args.seed, workdir
+            ):
+                print(f"{n_pages:>9} {engine:<17} {seconds:>9.3f} "
+                      f"{peak / 2 ** 20:>9.1f} {error:>9.2e}")
+
+
+if __name__ == "__main__":
+    main()
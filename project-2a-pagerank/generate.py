@@ -0,0 +1,126 @@
+import argparse
+import os
+
+import numpy as np
+
+from outofcore import write_edges
+
+
+def unique_links(sources, targets, n_pages):
+    """
+    Return the (sources, targets) arrays with self-links and duplicate
+    links removed, sorted by source.
+    """
+    keys = sources * n_pages + targets
+    keys = np.sort(keys[sources != targets])
+    if keys.size:
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    return keys // n_pages, keys % n_pages
+
+
+def random_graph(n_pages, links_per_page=10, seed=None):
+    """
+    Return (sources, targets) arrays of a random graph where about
+    `links_per_page * n_pages` links join uniformly chosen pages.
+    """
+    rng = np.random.default_rng(seed)
+    n_links = links_per_page * n_pages
+    sources = rng.integers(n_pages, size=n_links)
+    targets = rng.integers(n_pages, size=n_links)
+    return unique_links(sources, targets, n_pages)
+
+
+def scale_free_graph(n_pages, links_per_page=10, exponent=2.1, seed=None):
+    """
+    Return (sources, targets) arrays of a random graph whose in-degrees
+    and out-degrees both follow power laws with the given `exponent`,
+    averaging about `links_per_page` links per page.
+
+    Each page gets a weight from a Pareto distribution; links pick their
+    source and target independently in proportion to those weights.
+    """
+    rng = np.random.default_rng(seed)
+    n_links = links_per_page * n_pages
+
+    def weights():
+        weight = rng.pareto(exponent - 1, size=n_pages) + 1
+        return np.cumsum(weight / weight.sum())
+
+    def draw(cumulative):
+        pages = np.searchsorted(cumulative, rng.random(n_links), side="right")
+        return np.minimum(pages, n_pages - 1)
+
+    sources = draw(weights())
+    targets = draw(weights())
+    return unique_links(sources, targets, n_pages)
+
+
+def page_names(n_pages):
+    return [f"{i}.html" for i in range(n_pages)]
+
+
+def write_corpus(directory, sources, targets, n_pages):
+    """
+    Write a graph as a directory of HTML pages in the format of corpus0,
+    one page per node linking to its targets.
+    """
+    os.makedirs(directory, exist_ok=True)
+    names = page_names(n_pages)
+    bounds = np.searchsorted(sources, np.arange(n_pages + 1))
+    for i, name in enumerate(names):
+        links = "".join(
+            f'            <li><a href="{names[j]}">{names[j]}</a></li>\n'
+            for j in targets[bounds[i]:bounds[i + 1]].tolist()
+        )
+        with open(os.path.join(directory, name), "w") as f:
+            f.write(
+                "<!DOCTYPE html>\n"
+                "<html lang=\"en\">\n"
+                "    <head>\n"
+                f"        <title>{i}</title>\n"
+                "    </head>\n"
+                "    <body>\n"
+                f"        <h1>{i}</h1>\n"
+                "\n"
+                "        <div>Links:</div>\n"
+                "        <ul>\n"
+                f"{links}"
+                "        </ul>\n"
+                "    </body>\n"
+                "</html>\n"
+            )
+
+
+GRAPHS = {
+    "random": random_graph,
+    "scale-free": scale_free_graph,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic link graph."
+    )
+    parser.add_argument("kind", choices=sorted(GRAPHS))
+    parser.add_argument("pages", type=int, help="number of pages")
+    parser.add_argument("output",
+                        help="corpus directory, or edge file with --edges")
+    parser.add_argument("--links", type=int, default=10,
+                        help="average links per page (default 10)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--edges", action="store_true",
+                        help="write an edge file instead of HTML pages")
+    args = parser.parse_args()
+
+    sources, targets = GRAPHS[args.kind](args.pages, args.links, seed=args.seed)
+    if args.edges:
+        write_edges(args.output, sources, targets, args.pages)
+        with open(args.output + ".pages", "w") as f:
+            f.writelines(name + "\n" for name in page_names(args.pages))
+    else:
+        write_corpus(args.output, sources, targets, args.pages)
+    print(f"Wrote {args.pages} pages and {len(sources)} links")
+
+
+if __name__ == "__main__":
+    main()
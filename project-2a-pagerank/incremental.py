@@ -0,0 +1,198 @@
+import argparse
+import os
+
+import numpy as np
+
+from pagerank import (DAMPING, MAX_ITERATIONS, TOLERANCE, crawl_edges,
+                      damped_step, power_iteration, transition_matrix)
+
+
+def load_state(path):
+    """
+    Load the pages, edges and rank vector saved by `save_state`.
+    Return a tuple (pages, sources, targets, rank), or None if `path`
+    does not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as state:
+        return (state["pages"].tolist(), state["sources"], state["targets"],
+                state["rank"])
+
+
+def save_state(path, pages, sources, targets, rank):
+    """
+    Save the pages, edges and rank vector of a solved corpus to `path`.
+    """
+    with open(path, "wb") as f:
+        np.savez(f, pages=np.array(pages), sources=sources, targets=targets,
+                 rank=rank)
+
+
+def edge_delta(old_pages, old_sources, old_targets,
+               pages, sources, targets):
+    """
+    Compare an old edge list with a new one.
+
+    Return a tuple (added, removed) of (sources, targets) array pairs,
+    giving the links that were added and removed as indices into the new
+    `pages`. Removed links from or to pages that no longer exist are left
+    out, since those pages have no index.
+    """
+    n_pages = len(pages)
+    index = {page: i for i, page in enumerate(pages)}
+    old_to_new = np.array(
+        [index.get(page, -1) for page in old_pages], dtype=np.int64
+    )
+    old_sources = old_to_new[old_sources]
+    old_targets = old_to_new[old_targets]
+    kept = (old_sources >= 0) & (old_targets >= 0)
+
+    # Encode each link as a single integer to compare them as sets
+    old_keys = np.sort(old_sources[kept] * n_pages + old_targets[kept])
+    new_keys = np.sort(sources * n_pages + targets)
+    added = new_keys[~contains(old_keys, new_keys)]
+    removed = old_keys[~contains(new_keys, old_keys)]
+    return ((added // n_pages, added % n_pages),
+            (removed // n_pages, removed % n_pages))
+
+
+def contains(sorted_keys, keys):
+    """
+    Return a boolean array marking which of `keys` are in the sorted
+    array `sorted_keys`.
+    """
+    if sorted_keys.size == 0:
+        return np.zeros(keys.shape, dtype=bool)
+    positions = np.searchsorted(sorted_keys, keys)
+    positions[positions == sorted_keys.size] = 0
+    return sorted_keys[positions] == keys
+
+
+def warm_start(old_pages, old_rank, pages):
+    """
+    Return a starting rank vector for `pages`, keeping the old rank of
+    every page that still exists, giving new pages the average rank and
+    normalizing the result to sum to 1.
+    """
+    previous = dict(zip(old_pages, old_rank.tolist()))
+    default = 1 / len(pages)
+    rank = np.array([previous.get(page, default) for page in pages])
+    return rank / rank.sum()
+
+
+def affected_pages(matrix, seeds, hops):
+    """
+    Return a boolean array marking `seeds` and every page reachable from
+    them by following at most `hops` links.
+    """
+    affected = np.zeros(matrix.shape[0], dtype=bool)
+    affected[seeds] = True
+    frontier = affected.copy()
+    links = matrix.astype(bool)
+    for _ in range(hops):
+        reached = (links @ frontier) & ~affected
+        if not reached.any():
+            break
+        affected |= reached
+        frontier = reached
+    return affected
+
+
+def local_iteration(matrix, dangling, damping_factor, rank, affected,
+                    tolerance=TOLERANCE, stats=None,
+                    max_iterations=MAX_ITERATIONS):
+    """
+    Return the rank vector after power iteration that only updates the
+    pages marked in `affected`, keeping every other page at its value in
+    `rank`, stopping once the L1 change of the affected pages is at most
+    `tolerance`, or after `max_iterations` iterations.
+    """
+    rows = matrix[affected]
+    rank = rank.copy()
+    for _ in range(max_iterations):
+        if stats is not None:
+            stats["iterations"] = stats.get("iterations", 0) + 1
+        next_rank = damped_step(rows @ rank, rank, dangling, damping_factor)
+        delta = np.abs(next_rank - rank[affected]).sum()
+        rank[affected] = next_rank
+        if delta <= tolerance:
+            break
+    return rank / rank.sum()
+
+
+def update_pagerank(state, pages, sources, targets, damping_factor,
+                    tolerance=TOLERANCE, hops=None, stats=None):
+    """
+    Return the rank vector of a corpus given by its edge list, reusing
+    `state`, a tuple (pages, sources, targets, rank) from a previous run,
+    or solving from scratch if `state` is None.
+
+    The previous ranks warm-start power iteration. If `hops` is given,
+    only pages within `hops` links downstream of a page whose links
+    changed are updated, which is faster but approximate. Adding or
+    removing pages, or pages gaining their first link or losing their
+    last, changes every page's share of the random jumps, so then all
+    pages are updated.
+    """
+    n_pages = len(pages)
+    matrix, dangling = transition_matrix(sources, targets, n_pages)
+    if state is None:
+        return power_iteration(matrix, dangling, damping_factor, tolerance,
+                               stats=stats)
+
+    old_pages, old_sources, old_targets, old_rank = state
+    rank = warm_start(old_pages, old_rank, pages)
+    old_dangling = np.bincount(old_sources, minlength=len(old_pages)) == 0
+    if (hops is None or list(old_pages) != list(pages)
+            or not np.array_equal(old_dangling, dangling)):
+        return power_iteration(matrix, dangling, damping_factor, tolerance,
+                               rank=rank, stats=stats)
+
+    # Pages linked to by a page whose links changed, before or after
+    added, removed = edge_delta(old_pages, old_sources, old_targets,
+                                pages, sources, targets)
+    changed = np.zeros(n_pages, dtype=bool)
+    changed[added[0]] = True
+    changed[removed[0]] = True
+    seeds = np.concatenate((removed[1], targets[changed[sources]]))
+    if stats is not None:
+        stats["changed"] = int(changed.sum())
+    if seeds.size == 0:
+        return rank
+    affected = affected_pages(matrix, seeds, hops)
+    if stats is not None:
+        stats["affected"] = int(affected.sum())
+    return local_iteration(matrix, dangling, damping_factor, rank, affected,
+                           tolerance, stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-rank a corpus, reusing the ranks of the last run."
+    )
+    parser.add_argument("corpus", help="directory of HTML pages")
+    parser.add_argument("state", help="file the ranks are kept in between runs")
+    parser.add_argument("--hops", type=int, default=None,
+                        help="only update pages this many links "
+                             "downstream of a change (approximate)")
+    parser.add_argument("--damping", type=float, default=DAMPING)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    state = load_state(args.state)
+    pages, sources, targets = crawl_edges(
+        args.corpus, cache=args.state + ".links"
+    )
+    stats = dict()
+    rank = update_pagerank(state, pages, sources, targets, args.damping,
+                           args.tolerance, args.hops, stats)
+    save_state(args.state, pages, sources, targets, rank)
+
+    print(f"PageRank Results ({stats.get('iterations', 0)} iterations)")
+    for page, value in sorted(zip(pages, rank.tolist())):
+        print(f"  {page}: {value:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import argparse
+import os
+
+import numpy as np
+
+from pagerank import (DAMPING, MAX_ITERATIONS, TOLERANCE, crawl_edges,
+                      damped_step)
+
+# Edge files start with a header of four little-endian int64 values:
+# MAGIC, the byte width of every index (4 or 8), the number of pages and
+# the number of links. The out-degree of every page follows, then every
+# link as a (target, source) record, sorted by target.
+MAGIC = int.from_bytes(b"PAGERANK", "little")
+HEADER = np.dtype([("magic", "<i8"), ("width", "<i8"),
+                   ("n_pages", "<i8"), ("n_edges", "<i8")])
+BLOCK_SIZE = 1 << 22
+
+
+def index_dtype(width):
+    return np.dtype("<u4") if width == 4 else np.dtype("<i8")
+
+
+def edge_dtype(width):
+    index = index_dtype(width)
+    return np.dtype([("target", index), ("source", index)])
+
+
+def write_edges(path, sources, targets, n_pages):
+    """
+    Write the links given by the integer arrays `sources` and `targets`
+    of a graph of `n_pages` pages to an edge file at `path`.
+    """
+    width = 4 if n_pages < 2 ** 32 else 8
+    order = np.lexsort((sources, targets))
+    edges = np.empty(len(order), dtype=edge_dtype(width))
+    edges["target"] = targets[order]
+    edges["source"] = sources[order]
+    out_degree = np.bincount(sources, minlength=n_pages)
+
+    header = np.array([(MAGIC, width, n_pages, len(edges))], dtype=HEADER)
+    with open(path, "wb") as f:
+        header.tofile(f)
+        out_degree.astype(index_dtype(width)).tofile(f)
+        edges.tofile(f)
+
+
+def read_header(path):
+    """
+    Return a tuple (width, n_pages, n_edges) read from an edge file.
+    """
+    header = np.fromfile(path, dtype=HEADER, count=1)
+    if len(header) != 1 or header["magic"][0] != MAGIC:
+        raise ValueError(f"{path} is not an edge file")
+    return (int(header["width"][0]), int(header["n_pages"][0]),
+            int(header["n_edges"][0]))
+
+
+def edge_blocks(path, block_size=BLOCK_SIZE):
+    """
+    Yield the links of an edge file as arrays of at most `block_size`
+    (target, source) records, each read through its own memory map so
+    that only one block is mapped at a time.
+    """
+    width, n_pages, n_edges = read_header(path)
+    dtype = edge_dtype(width)
+    offset = HEADER.itemsize + n_pages * width
+    for start in range(0, n_edges, block_size):
+        count = min(block_size, n_edges - start)
+        block = np.memmap(path, dtype=dtype, mode="r",
+                          offset=offset + start * dtype.itemsize,
+                          shape=(count,))
+        yield block
+        del block
+
+
+def memmap_pagerank(path, damping_factor, tolerance=TOLERANCE,
+                    block_size=BLOCK_SIZE, stats=None,
+                    max_iterations=MAX_ITERATIONS):
+    """
+    Return the PageRank vector of the graph in an edge file, streaming
+    its links from disk in blocks on every iteration. Only the rank
+    vectors and out-degrees, which grow with the number of pages rather
+    than links, are kept in memory.
+
+    Iteration stops once the L1 distance between successive vectors is
+    at most `tolerance`, or after `max_iterations` iterations. If `stats` is a dict, the number of iterations
+    is added to its "iterations" counter.
+    """
+    width, n_pages, _ = read_header(path)
+    out_degree = np.fromfile(path, dtype=index_dtype(width), count=n_pages,
+                             offset=HEADER.itemsize).astype(np.float64)
+    dangling = out_degree == 0
+    out_degree[dangling] = 1
+
+    rank = np.full(n_pages, 1 / n_pages)
+    for _ in range(max_iterations):
+        if stats is not None:
+            stats["iterations"] = stats.get("iterations", 0) + 1
+        share = rank / out_degree
+        linked = np.zeros(n_pages)
+        for block in edge_blocks(path, block_size):
+
+            # Links are sorted by target, so each block only adds to a
+            # contiguous range of pages
+            first = int(block["target"][0])
+            last = int(block["target"][-1])
+            linked[first:last + 1] += np.bincount(
+                block["target"] - first,
+                weights=share[block["source"]],
+                minlength=last - first + 1,
+            )
+        next_rank = damped_step(linked, rank, dangling, damping_factor)
+        delta = np.abs(next_rank - rank).sum()
+        rank = next_rank
+        if delta <= tolerance:
+            break
+    return rank / rank.sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rank graphs larger than memory from an edge file."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    write = commands.add_parser("write", help="crawl a corpus to an edge file")
+    write.add_argument("corpus", help="directory of HTML pages")
+    write.add_argument("edges", help="edge file to write")
+    rank = commands.add_parser("rank", help="rank the pages of an edge file")
+    rank.add_argument("edges", help="edge file to read")
+    rank.add_argument("--damping", type=float, default=DAMPING)
+    rank.add_argument("--tolerance", type=float, default=TOLERANCE)
+    rank.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    rank.add_argument("--top", type=int, default=10,
+                      help="number of pages to print (default 10)")
+    args = parser.parse_args()
+
+    # Page names are kept one per line next to the edge file
+    names = args.edges + ".pages"
+    if args.command == "write":
+        pages, sources, targets = crawl_edges(args.corpus)
+        write_edges(args.edges, sources, targets, len(pages))
+        with open(names, "w") as f:
+            f.writelines(page + "\n" for page in pages)
+        return
+
+    stats = dict()
+    ranks = memmap_pagerank(args.edges, args.damping, args.tolerance,
+                            args.block_size, stats)
+    if os.path.exists(names):
+        with open(names) as f:
+            pages = f.read().splitlines()
+    else:
+        pages = [str(i) for i in range(len(ranks))]
+    print(f"PageRank Results ({stats['iterations']} iterations)")
+    for i in np.argsort(-ranks, kind="stable")[:args.top]:
+        print(f"  {pages[i]}: {ranks[i]:.4f}")
+
+
+if __name__ == "__main__":
+    main()
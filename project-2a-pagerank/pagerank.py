@@ -1,14 +1,22 @@
 import os
-import random
+import pickle
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-# added
-from collections import Counter
-import copy
+import numpy as np
+from scipy import sparse
 
 DAMPING = 0.85
 SAMPLES = 10000
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 1000
+CHUNK_SIZE = 1 << 16
+
+# Longest partial tag carried from one chunk to the next
+MAX_TAG = 1 << 12
+
+LINK = re.compile(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
 
 
 def main():
@@ -25,22 +33,15 @@ def main():
         print(f"  {page}: {ranks[page]:.4f}")
 
 
-def crawl(directory):
+def crawl(directory, workers=None, processes=False, cache=None):
     """
     Parse a directory of HTML pages and check for links to other pages.
     Return a dictionary where each key is a page, and values are
     a list of all other pages in the corpus that are linked to by the page.
-    """
-    pages = dict()
 
-    # Extract all links from HTML files
-    for filename in os.listdir(directory):
-        if not filename.endswith(".html"):
-            continue
-        with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
+    See `crawl_links` for the meaning of `workers`, `processes` and `cache`.
+    """
+    pages = crawl_links(directory, workers, processes, cache)
 
     # Only include links to other pages in the corpus
     for filename in pages:
@@ -52,6 +53,108 @@ def crawl(directory):
     return pages
 
 
+def crawl_edges(directory, workers=None, processes=False, cache=None):
+    """
+    Crawl a directory like `crawl`, but return the links as a compact
+    integer edge list: a tuple (pages, sources, targets) as returned by
+    `edge_arrays`.
+    """
+    links = crawl_links(directory, workers, processes, cache)
+    pages = sorted(links)
+    index = {page: i for i, page in enumerate(pages)}
+    sources = []
+    targets = []
+    for i, page in enumerate(pages):
+        for link in links[page]:
+            j = index.get(link)
+            if j is not None:
+                sources.append(i)
+                targets.append(j)
+    return (pages, np.array(sources, dtype=np.int64),
+            np.array(targets, dtype=np.int64))
+
+
+def crawl_links(directory, workers=None, processes=False, cache=None):
+    """
+    Return a dictionary mapping each HTML page in `directory` to the set
+    of all links found in it, other than to itself, including links to
+    pages outside the corpus.
+
+    Pages are parsed by a pool of `workers` threads, or processes if
+    `processes` is true. If `cache` is the path of a cache file, the
+    links of every page are saved there along with the page's
+    modification time, and pages unchanged since the last crawl are not
+    read again.
+    """
+    entries = [
+        entry for entry in os.scandir(directory)
+        if entry.name.endswith(".html")
+    ]
+
+    cached = dict()
+    if cache is not None and os.path.exists(cache):
+        with open(cache, "rb") as f:
+            cached = pickle.load(f)
+
+    pages = dict()
+    mtimes = dict()
+    stale = []
+    for entry in entries:
+        mtimes[entry.name] = entry.stat().st_mtime_ns
+        if cached.get(entry.name, (None,))[0] == mtimes[entry.name]:
+            pages[entry.name] = set(cached[entry.name][1])
+        else:
+            stale.append(entry.name)
+
+    # Extract all links from changed HTML files
+    executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    paths = [os.path.join(directory, filename) for filename in stale]
+    with executor(workers) as pool:
+        for filename, links in zip(
+            stale, pool.map(extract_links, paths, chunksize=64)
+        ):
+            pages[filename] = links
+
+    if cache is not None and (stale or len(cached) != len(pages)):
+        with open(cache, "wb") as f:
+            pickle.dump({
+                filename: (mtimes[filename], frozenset(pages[filename]))
+                for filename in pages
+            }, f)
+
+    return pages
+
+
+def extract_links(path, chunk_size=CHUNK_SIZE):
+    """
+    Return the set of links in the HTML file at `path`, other than to
+    the file itself, reading it `chunk_size` characters at a time.
+    Links in tags longer than MAX_TAG characters that span two chunks
+    may be missed.
+    """
+    links = set()
+    tail = ""
+    with open(path) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            contents = tail + chunk
+            end = 0
+            for match in LINK.finditer(contents):
+                links.add(match.group(1))
+                end = match.end()
+
+            # Carry over a tag that may continue into the next chunk, unless
+            # it is too long to be one, such as after a stray "<"
+            start = contents.rfind("<")
+            tail = (contents[start:]
+                    if start >= end and len(contents) - start <= MAX_TAG
+                    else "")
+    links.discard(os.path.basename(path))
+    return links
+
+
 def transition_model(corpus, page, damping_factor):
     """
     Return a probability distribution over which page to visit next,
@@ -75,7 +178,7 @@ def transition_model(corpus, page, damping_factor):
     return prob
 
 
-def sample_pagerank(corpus, damping_factor, n):
+def sample_pagerank(corpus, damping_factor, n, walkers=None, seed=None):
     """
     Return PageRank values for each page by sampling `n` pages
     according to transition model, starting with a page at random.
@@ -83,23 +186,125 @@ def sample_pagerank(corpus, damping_factor, n):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
+
+    Surfers are simulated in batches of `walkers` at a time (enough for
+    about `n` samples by default) with a NumPy generator seeded by `seed`.
+    Each surfer starts on a random page and keeps following a random link
+    with probability `damping_factor`, stopping otherwise; a page with
+    no links leads to a random page. Counting every page visited on these
+    complete paths gives an unbiased estimate of PageRank without a
+    burn-in period, and sampling stops once at least `n` pages have been
+    visited.
     """
-    pages = list(corpus.keys())
+    pages, sources, targets = edge_arrays(corpus)
     n_pages = len(pages)
-    p = pages[random.randint(0,n_pages-1)]
-    prob = transition_model(corpus, p, damping_factor)
-    outcomes = [p]
+    out_degree = np.bincount(sources, minlength=n_pages)
+    first_link = np.concatenate(([0], np.cumsum(out_degree)[:-1]))
+    rng = np.random.default_rng(seed)
+
+    counts = np.zeros(n_pages, dtype=np.int64)
+    total = 0
+    while total < n:
+        # Each surfer visits 1 / (1 - damping_factor) pages on average
+        batch = walkers or max(1, int((n - total) * (1 - damping_factor)))
+        current = rng.integers(n_pages, size=batch)
+        while current.size:
+            counts += np.bincount(current, minlength=n_pages)
+            total += current.size
+            current = current[rng.random(current.size) < damping_factor]
+
+            # Follow a random link, or jump anywhere from a page with none
+            degree = out_degree[current]
+            follow = degree > 0
+            offset = (rng.random(current.size) * degree).astype(np.int64)
+            following = current[follow]
+            current = rng.integers(n_pages, size=current.size)
+            current[follow] = targets[first_link[following] + offset[follow]]
+
+    return dict(zip(pages, (counts / total).tolist()))
+
+
+def edge_arrays(corpus):
+    """
+    Return a tuple (pages, sources, targets) where `pages` is a sorted list
+    of page names and `sources` and `targets` are integer arrays giving,
+    for every link, the index of the linking page and the linked page.
+    """
+    pages = sorted(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+    sources = []
+    targets = []
+    for page in pages:
+        i = index[page]
+        for link in corpus[page]:
+            sources.append(i)
+            targets.append(index[link])
+    return (pages, np.array(sources, dtype=np.int64),
+            np.array(targets, dtype=np.int64))
+
 
-    for _ in range(n-1):
-        p = random.choices(list(prob.keys()), weights=list(prob.values()), k=1)[0]
-        prob = transition_model(corpus, p, damping_factor)
-        outcomes.append(p)
-    out_prob = {k: v/n for k, v in Counter(outcomes).items()}
+def transition_matrix(sources, targets, n_pages):
+    """
+    Return a tuple (matrix, dangling) where `matrix` is the sparse
+    column-stochastic link matrix, with matrix[j, i] = 1 / (links of i)
+    when page i links to page j, and `dangling` is a boolean array marking
+    pages with no links.
 
-    return out_prob
+    Columns of dangling pages are all zero; their rank is spread over
+    every page separately, as if they linked to all pages.
+    """
+    out_degree = np.bincount(sources, minlength=n_pages)
+    weights = 1 / out_degree[sources]
+    matrix = sparse.csr_matrix(
+        (weights, (targets, sources)), shape=(n_pages, n_pages)
+    )
+    return matrix, out_degree == 0
 
 
-def iterate_pagerank(corpus, damping_factor):
+def damped_step(linked, rank, dangling, damping_factor, jump=None):
+    """
+    Return the next rank vector of the random surfer, given `linked`, the
+    rank each page receives along links from `rank`. Pages with no links
+    spread their rank over every page, and the surfer jumps to a page
+    drawn from `jump`, uniform by default, with probability
+    `1 - damping_factor`.
+
+    `rank` may also be a matrix with one rank vector per column.
+    """
+    n_pages = len(rank)
+    if jump is None:
+        jump = 1 / n_pages
+    return damping_factor * (
+        linked + rank[dangling].sum(axis=0) / n_pages
+    ) + (1 - damping_factor) * jump
+
+
+def power_iteration(matrix, dangling, damping_factor, tolerance=TOLERANCE,
+                    rank=None, stats=None, max_iterations=MAX_ITERATIONS):
+    """
+    Return the PageRank vector of the link matrix by power iteration,
+    starting from `rank` (uniform by default) and stopping once the L1
+    distance between successive vectors is at most `tolerance`, or after
+    `max_iterations` iterations.
+
+    If `stats` is a dict, the number of iterations is added to its
+    "iterations" counter.
+    """
+    n_pages = matrix.shape[0]
+    if rank is None:
+        rank = np.full(n_pages, 1 / n_pages)
+    for _ in range(max_iterations):
+        if stats is not None:
+            stats["iterations"] = stats.get("iterations", 0) + 1
+        next_rank = damped_step(matrix @ rank, rank, dangling, damping_factor)
+        delta = np.abs(next_rank - rank).sum()
+        rank = next_rank
+        if delta <= tolerance:
+            break
+    return rank / rank.sum()
+
+
+def iterate_pagerank(corpus, damping_factor, tolerance=TOLERANCE):
     """
     Return PageRank values for each page by iteratively updating
     PageRank values until convergence.
@@ -107,28 +312,14 @@ def iterate_pagerank(corpus, damping_factor):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
-    """
-    e = 0.001
-    pages = list(corpus.keys())
-    n_pages = len(pages)
-    prob = {p:1/n_pages for p in pages} # initialized prob
-    next_prob = {}
-    link_to = {p:[] for p in pages} # invert of corpus; values will collect pages that link to the key
-
-    for p in pages:
-        for v in corpus[p]:
-            link_to[v].append(p)
-
-    while True:
-        for p in pages:
-            links = link_to[p]
-            next_prob[p] = (1-damping_factor)/n_pages + damping_factor*sum([prob[i]/len(corpus[i]) for i in links])
-        delta = [abs(n-p) for n, p in zip(next_prob.values(), prob.values())]
-        prob = copy.deepcopy(next_prob)
-        if sum([1 if d>e else 0 for d in delta]) == 0:
-            break
 
-    return prob
+    A page with no links is interpreted as having one link for every
+    page in the corpus, including itself.
+    """
+    pages, sources, targets = edge_arrays(corpus)
+    matrix, dangling = transition_matrix(sources, targets, len(pages))
+    rank = power_iteration(matrix, dangling, damping_factor, tolerance)
+    return dict(zip(pages, rank.tolist()))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,103 @@
+import sys
+
+import numpy as np
+
+from pagerank import (DAMPING, MAX_ITERATIONS, TOLERANCE, crawl_edges,
+                      damped_step, transition_matrix)
+
+BLOCK_SIZE = 64
+
+
+def personalized_pagerank(matrix, dangling, damping_factor, teleport,
+                          tolerance=TOLERANCE, block_size=BLOCK_SIZE):
+    """
+    Return a matrix whose columns are the PageRank vectors for each column
+    of `teleport`, an (n_pages, k) array of teleport distributions.
+
+    With probability `1 - damping_factor` the surfer jumps to a page drawn
+    from its teleport distribution rather than a uniform one; pages with
+    no links still lead to a uniformly random page, as in
+    `iterate_pagerank`. PageRank is then linear in the teleport vector, so
+    when fewer than k pages appear in any teleport distribution, only one
+    vector per such page is solved and the columns are combined from
+    those.
+    """
+    teleport = np.asarray(teleport, dtype=np.float64)
+    teleport = teleport / teleport.sum(axis=0)
+    seeds = np.flatnonzero(teleport.any(axis=1))
+    if len(seeds) >= teleport.shape[1]:
+        return solve_blocks(matrix, dangling, damping_factor, teleport,
+                            tolerance, block_size)
+
+    basis = np.zeros((teleport.shape[0], len(seeds)))
+    basis[seeds, np.arange(len(seeds))] = 1
+    ranks = solve_blocks(matrix, dangling, damping_factor, basis,
+                         tolerance, block_size)
+    return ranks @ teleport[seeds]
+
+
+def solve_blocks(matrix, dangling, damping_factor, teleport,
+                 tolerance=TOLERANCE, block_size=BLOCK_SIZE,
+                 max_iterations=MAX_ITERATIONS):
+    """
+    Solve personalized PageRank for the columns of `teleport`, `block_size`
+    columns at a time, so every iteration is one sparse-matrix by
+    dense-matrix product. Columns whose L1 change is at most `tolerance`
+    are dropped from their block as they converge, and any left after
+    `max_iterations` iterations keep their last value.
+    """
+    ranks = np.empty_like(teleport)
+    for start in range(0, teleport.shape[1], block_size):
+        columns = np.arange(start, min(start + block_size, teleport.shape[1]))
+        jump = teleport[:, columns]
+        rank = jump.copy()
+        for _ in range(max_iterations):
+            next_rank = damped_step(matrix @ rank, rank, dangling,
+                                    damping_factor, jump)
+            converged = np.abs(next_rank - rank).sum(axis=0) <= tolerance
+            rank = next_rank
+            if converged.any():
+                ranks[:, columns[converged]] = rank[:, converged]
+                columns = columns[~converged]
+                rank = rank[:, ~converged]
+                jump = jump[:, ~converged]
+            if not columns.size:
+                break
+        ranks[:, columns] = rank
+    return ranks / ranks.sum(axis=0)
+
+
+def teleport_matrix(pages, seed_sets):
+    """
+    Return an (n_pages, k) teleport matrix spreading each column's jumps
+    uniformly over one of the k sets of seed pages.
+    """
+    index = {page: i for i, page in enumerate(pages)}
+    teleport = np.zeros((len(pages), len(seed_sets)))
+    for column, seeds in enumerate(seed_sets):
+        for page in seeds:
+            teleport[index[page], column] = 1 / len(seeds)
+    return teleport
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python personalized.py corpus seeds [seeds ...]\n"
+                 "where seeds is a comma-separated list of pages")
+    pages, sources, targets = crawl_edges(sys.argv[1])
+    seed_sets = [set(seeds.split(",")) for seeds in sys.argv[2:]]
+    for seeds in seed_sets:
+        for page in seeds - set(pages):
+            sys.exit(f"{page} is not in the corpus")
+
+    matrix, dangling = transition_matrix(sources, targets, len(pages))
+    ranks = personalized_pagerank(matrix, dangling, DAMPING,
+                                  teleport_matrix(pages, seed_sets))
+    for column, seeds in enumerate(seed_sets):
+        print(f"PageRank Results personalized to {', '.join(sorted(seeds))}")
+        for i, page in enumerate(pages):
+            print(f"  {page}: {ranks[i, column]:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import argparse
+import time
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import spsolve_triangular
+
+from pagerank import (DAMPING, MAX_ITERATIONS, TOLERANCE, crawl_edges,
+                      damped_step, transition_matrix)
+
+
+def power_step(matrix, dangling, damping_factor, rank):
+    """
+    Return one Jacobi (power iteration) update of `rank`.
+    """
+    return damped_step(matrix @ rank, rank, dangling, damping_factor)
+
+
+def solve(update, rank, tolerance, max_iterations, time_limit):
+    """
+    Run `update(rank, iteration)` until the L1 distance between successive
+    normalized vectors is at most `tolerance`, `max_iterations` updates
+    have been made, or `time_limit` seconds have passed.
+
+    Return a tuple (rank, residuals) with the normalized final vector and
+    the residual after every iteration.
+    """
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    residuals = []
+    for iteration in range(max_iterations):
+        next_rank = update(rank, iteration)
+        next_rank = next_rank / next_rank.sum()
+        residuals.append(float(np.abs(next_rank - rank).sum()))
+        rank = next_rank
+        if residuals[-1] <= tolerance:
+            break
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+    return rank, residuals
+
+
+def power(matrix, dangling, damping_factor, tolerance=TOLERANCE,
+          max_iterations=MAX_ITERATIONS, time_limit=None):
+    """
+    Plain power iteration, as used by pagerank.iterate_pagerank.
+    """
+    def update(rank, iteration):
+        return power_step(matrix, dangling, damping_factor, rank)
+
+    rank = np.full(matrix.shape[0], 1 / matrix.shape[0])
+    return solve(update, rank, tolerance, max_iterations, time_limit)
+
+
+def gauss_seidel(matrix, dangling, damping_factor, tolerance=TOLERANCE,
+                 max_iterations=MAX_ITERATIONS, time_limit=None):
+    """
+    Gauss-Seidel sweeps, where each page's update already uses the
+    updated ranks of the pages before it.
+
+    PageRank is proportional to the solution x of (I - d * matrix) x = 1,
+    with dangling pages handled by the final normalization. Splitting
+    I - d * matrix into its lower triangle L (with the diagonal) and
+    strictly upper triangle U, each sweep solves L x' = 1 - U x by forward
+    substitution.
+    """
+    n_pages = matrix.shape[0]
+    system = sparse.identity(n_pages, format="csr") - damping_factor * matrix
+    lower = sparse.tril(system, format="csr")
+    upper = sparse.triu(system, k=1, format="csr")
+    ones = np.ones(n_pages)
+
+    # Sweeps work on the unnormalized solution, kept between iterations
+    x = [ones]
+
+    def update(rank, iteration):
+        x[0] = spsolve_triangular(lower, ones - upper @ x[0], lower=True)
+        return x[0]
+
+    rank = np.full(n_pages, 1 / n_pages)
+    return solve(update, rank, tolerance, max_iterations, time_limit)
+
+
+def extrapolated(matrix, dangling, damping_factor, tolerance=TOLERANCE,
+                 max_iterations=MAX_ITERATIONS, time_limit=None,
+                 method="quadratic", period=10):
+    """
+    Power iteration with an extrapolation step every `period` iterations,
+    using the last iterates to estimate and remove the slowest-decaying
+    error terms.
+
+    `method` is "aitken" for componentwise Aitken delta-squared
+    extrapolation from three iterates, or "quadratic" for quadratic
+    extrapolation from four (Kamvar et al., 2003).
+    """
+    history = []
+
+    def update(rank, iteration):
+        history.append(rank)
+        del history[:-3]
+        next_rank = power_step(matrix, dangling, damping_factor, rank)
+        if (iteration + 1) % period or len(history) < 3:
+            return next_rank
+        if method == "aitken":
+            return aitken(history[-2], history[-1], next_rank)
+        return quadratic(history[-3], history[-2], history[-1], next_rank)
+
+    rank = np.full(matrix.shape[0], 1 / matrix.shape[0])
+    return solve(update, rank, tolerance, max_iterations, time_limit)
+
+
+def aitken(x0, x1, x2):
+    """
+    Return the componentwise Aitken extrapolation of three iterates,
+    keeping x2 where the second difference vanishes or the result is
+    not positive.
+    """
+    second = x2 - 2 * x1 + x0
+    safe = np.abs(second) > 1e-15
+    result = x2.copy()
+    result[safe] = x2[safe] - (x2[safe] - x1[safe]) ** 2 / second[safe]
+    return np.where(result > 0, result, x2)
+
+
+def quadratic(x0, x1, x2, x3):
+    """
+    Return the quadratic extrapolation of four successive iterates.
+    """
+    y1 = x1 - x0
+    y2 = x2 - x0
+    y3 = x3 - x0
+    gamma, *_ = np.linalg.lstsq(np.column_stack((y1, y2)), -y3, rcond=None)
+    gamma1, gamma2, gamma3 = gamma[0], gamma[1], 1
+    result = ((gamma1 + gamma2 + gamma3) * x1 + (gamma2 + gamma3) * x2
+              + gamma3 * x3)
+    return np.where(result > 0, result, x3)
+
+
+def adaptive(matrix, dangling, damping_factor, tolerance=TOLERANCE,
+             max_iterations=MAX_ITERATIONS, time_limit=None, patience=3):
+    """
+    Adaptive PageRank (Kamvar et al., 2003): pages whose rank changed by
+    less than `tolerance / n_pages` for `patience` iterations in a row are
+    frozen, and later iterations only recompute the rows of the pages
+    still changing.
+    """
+    n_pages = matrix.shape[0]
+    threshold = tolerance / n_pages
+    active = np.ones(n_pages, dtype=bool)
+    steady = np.zeros(n_pages, dtype=np.int64)
+
+    # Rows of the matrix for the pages that were active when last sliced
+    sliced = {"pages": np.arange(n_pages), "rows": matrix}
+
+    def update(rank, iteration):
+        pages = sliced["pages"]
+        values = damped_step(sliced["rows"] @ rank, rank, dangling,
+                             damping_factor)
+        still = active[pages]
+        next_rank = rank.copy()
+        next_rank[pages[still]] = values[still]
+
+        # Freeze converged pages, and slice the matrix again once it has
+        # shrunk by a tenth, since slicing costs about one iteration
+        small = np.abs(next_rank - rank) < threshold
+        steady[small] += 1
+        steady[~small] = 0
+        active[steady >= patience] = False
+        if active.sum() < 0.9 * len(pages):
+            sliced["pages"] = np.flatnonzero(active)
+            sliced["rows"] = matrix[sliced["pages"]]
+        return next_rank
+
+    rank = np.full(n_pages, 1 / n_pages)
+    return solve(update, rank, tolerance, max_iterations, time_limit)
+
+
+SOLVERS = {
+    "power": power,
+    "gauss-seidel": gauss_seidel,
+    "aitken": lambda *args, **kwargs: extrapolated(
+        *args, method="aitken", **kwargs),
+    "quadratic": lambda *args, **kwargs: extrapolated(
+        *args, method="quadratic", **kwargs),
+    "adaptive": adaptive,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare PageRank solvers on a corpus."
+    )
+    parser.add_argument("corpus", help="directory of HTML pages")
+    parser.add_argument("--solver", choices=sorted(SOLVERS), action="append",
+                        help="solver to run, may be repeated (default: all)")
+    parser.add_argument("--damping", type=float, default=DAMPING)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--max-iterations", type=int, default=MAX_ITERATIONS)
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="seconds each solver may run")
+    parser.add_argument("--residuals", action="store_true",
+                        help="print the residual after every iteration")
+    args = parser.parse_args()
+
+    pages, sources, targets = crawl_edges(args.corpus)
+    matrix, dangling = transition_matrix(sources, targets, len(pages))
+    reference, _ = power(matrix, dangling, args.damping, tolerance=1e-12)
+
+    print(f"{'solver':<13} {'iterations':>10} {'seconds':>9} "
+          f"{'residual':>10} {'error':>10}")
+    for name in args.solver or SOLVERS:
+        start = time.perf_counter()
+        rank, residuals = SOLVERS[name](
+            matrix, dangling, args.damping, tolerance=args.tolerance,
+            max_iterations=args.max_iterations, time_limit=args.time_limit
+        )
+        elapsed = time.perf_counter() - start
+        error = np.abs(rank - reference).sum()
+        print(f"{name:<13} {len(residuals):>10} {elapsed:>9.4f} "
+              f"{residuals[-1]:>10.2e} {error:>10.2e}")
+        if args.residuals:
+            for iteration, residual in enumerate(residuals, 1):
+                print(f"  {iteration:>5}: {residual:.3e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import argparse
+import collections
+import csv
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from heredity import engines, load_data
+
+# Families read and dispatched to the pool at a time
+BLOCK_SIZE = 1000
+
+# Most results kept in memory and in the cache file, least recently used
+# first out
+CACHE_SIZE = 100000
+
+
+def load_families(path, key="family"):
+    """
+    Generate a tuple (family, people) for each family in `path`, which is
+    either a directory of CSV files in the format of `load_data`, one
+    family per file named after the file, or a single CSV file with an
+    extra `key` column naming each row's family.
+
+    A single CSV file is read one family at a time, so each family's rows
+    must be contiguous; a ValueError is raised for a family that appears
+    again after other families.
+    """
+    if os.path.isdir(path):
+        for entry in sorted(os.scandir(path), key=lambda entry: entry.name):
+            if entry.name.endswith(".csv"):
+                yield entry.name[:-len(".csv")], load_data(entry.path)
+        return
+
+    seen = set()
+    with open(path) as f:
+        rows = csv.DictReader(f)
+        for family, group in itertools.groupby(rows, lambda row: row[key]):
+            if family in seen:
+                raise ValueError(f"rows of family {family!r} in {path} "
+                                 "are not contiguous")
+            seen.add(family)
+            people = dict()
+            for row in group:
+                name = row["name"]
+                people[name] = {
+                    "name": name,
+                    "mother": row["mother"] or None,
+                    "father": row["father"] or None,
+                    "trait": (True if row["trait"] == "1" else
+                              False if row["trait"] == "0" else None)
+                }
+            yield family, people
+
+
+def network(people):
+    """
+    Return a family as a tuple with one (mother, father, trait) entry per
+    person, in the order of `people`, with parents given by position.
+    Families that differ only in names give equal tuples.
+    """
+    index = {name: i for i, name in enumerate(people)}
+    return tuple(
+        (index.get(person["mother"]), index.get(person["father"]),
+         person["trait"])
+        for person in people.values()
+    )
+
+
+def cache_key(engine, structure):
+    """
+    Return a hash of an engine name and a family `network`.
+    """
+    return hashlib.sha256(repr((engine, structure)).encode()).hexdigest()
+
+
+def infer(engine, structure):
+    """
+    Run `engine` on a family `network` and return a list with each
+    person's (gene, trait) distributions, in order, or the message of the
+    ValueError raised by an engine that cannot handle the family.
+    """
+    people = {
+        str(i): {
+            "name": str(i),
+            "mother": None if mother is None else str(mother),
+            "father": None if father is None else str(father),
+            "trait": trait,
+        }
+        for i, (mother, father, trait) in enumerate(structure)
+    }
+    try:
+        probabilities = engines()[engine](people)
+    except ValueError as e:
+        return str(e)
+    return [
+        (probabilities[str(i)]["gene"], probabilities[str(i)]["trait"])
+        for i in range(len(structure))
+    ]
+
+
+def run(families, engine, output, workers=None, cache=None):
+    """
+    Infer every family from the `families` iterable of (family, people)
+    tuples with `engine` and write one JSON line per person to `output`.
+
+    Families are read BLOCK_SIZE at a time. Within a block, families with
+    the same network are inferred once, and the distinct networks are
+    spread over a pool of `workers` processes. If `cache` is the path of
+    a cache file, results are also kept between runs, keyed by a hash of
+    the engine and network. Only the CACHE_SIZE most recently used
+    results are kept, in memory and in the file.
+
+    A family the engine rejects gets a single JSON line with its name and
+    the error instead, and other families are unaffected; failures are
+    not cached.
+
+    Return a dict counting families, people written, networks inferred,
+    cache hits and failed families.
+    """
+    cached = collections.OrderedDict()
+    if cache is not None and os.path.exists(cache):
+        with open(cache, "rb") as f:
+            cached.update(pickle.load(f))
+    stats = {"families": 0, "people": 0, "inferred": 0, "hits": 0,
+             "errors": 0}
+
+    families = iter(families)
+    with ProcessPoolExecutor(workers) as pool:
+        while True:
+            block = list(itertools.islice(families, BLOCK_SIZE))
+            if not block:
+                break
+            structures = [network(people) for _, people in block]
+            keys = [cache_key(engine, structure) for structure in structures]
+
+            todo = dict()
+            for key, structure in zip(keys, structures):
+                if key in cached:
+                    cached.move_to_end(key)
+                    stats["hits"] += 1
+                elif key in todo:
+                    stats["hits"] += 1
+                else:
+                    todo[key] = structure
+            results = pool.map(infer, itertools.repeat(engine),
+                               todo.values(),
+                               chunksize=max(1, len(todo) // (4 * (
+                                   workers or os.cpu_count() or 1))))
+            failed = dict()
+            for key, result in zip(todo, results):
+                if isinstance(result, str):
+                    failed[key] = result
+                else:
+                    cached[key] = result
+            stats["inferred"] += len(todo)
+
+            for (family, people), key in zip(block, keys):
+                stats["families"] += 1
+                if key in failed:
+                    output.write(json.dumps({
+                        "family": family,
+                        "error": failed[key],
+                    }) + "\n")
+                    stats["errors"] += 1
+                    continue
+                for name, (gene, trait) in zip(people, cached[key]):
+                    output.write(json.dumps({
+                        "family": family,
+                        "person": name,
+                        "gene": gene,
+                        "trait": trait,
+                    }) + "\n")
+                stats["people"] += len(people)
+            output.flush()
+
+            while len(cached) > CACHE_SIZE:
+                cached.popitem(last=False)
+
+    if cache is not None and stats["inferred"]:
+        with open(cache, "wb") as f:
+            pickle.dump(cached, f)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Infer heredity probabilities for many families, "
+                    "writing one JSON line per person."
+    )
+    parser.add_argument("families",
+                        help="directory of family CSV files, or one CSV "
+                             "file with a family column")
+    parser.add_argument("--key", default="family",
+                        help="family column of a single CSV file")
+    parser.add_argument("--engine", choices=sorted(engines()),
+                        default="propagation")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of processes (default: one per CPU)")
+    parser.add_argument("--cache", default=None,
+                        help="file to keep results in between runs")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        stats = run(load_families(args.families, args.key), args.engine,
+                    sys.stdout, args.workers, args.cache)
+    except ValueError as e:
+        sys.exit(str(e))
+    print(f"{stats['families']} families, {stats['people']} people, "
+          f"{stats['inferred']} inferred, {stats['hits']} cache hits, "
+          f"{stats['errors']} failed "
+          f"in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
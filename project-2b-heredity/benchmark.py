@@ -0,0 +1,116 @@
+import argparse
+import time
+import tracemalloc
+
+from generate import random_pedigree
+from heredity import engines
+
+# Family sizes to benchmark
+SIZES = [3, 6, 9, 12, 30, 100, 300, 1000]
+
+# Largest family each engine is run on; engines not listed run on all
+LIMITS = {
+    "brute-force": 8,
+    "enumerate": 10,
+    "vectorized": 13,
+    "elimination": 300,
+    "weighting": 300,
+    "gibbs": 300,
+}
+
+# Exact engines to measure errors against, the first one that is run
+REFERENCES = ["brute-force", "propagation"]
+
+
+def measure(function, *args, **kwargs):
+    """
+    Call `function` and return a tuple (result, seconds, peak bytes
+    allocated during the call).
+    """
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def max_error(probabilities, reference):
+    """
+    Return the largest absolute difference between two sets of
+    distributions.
+    """
+    return max(
+        abs(probabilities[name][field][value]
+            - reference[name][field][value])
+        for name in reference
+        for field in reference[name]
+        for value in reference[name][field]
+    )
+
+
+def benchmark(names, n_people, observed=0.5, loops=0.0, seed=0):
+    """
+    Run the engines in `names` that allow families of `n_people` on one
+    random pedigree, skipping any that reject the pedigree with a
+    ValueError or run out of memory on it. Return a list of (engine,
+    seconds, peak bytes, max error) tuples, with errors measured against
+    the first engine in REFERENCES that is run.
+    """
+    people = random_pedigree(n_people, observed, loops, seed=seed)
+    available = engines()
+    results = dict()
+    for name in names:
+        if n_people <= LIMITS.get(name, n_people):
+            try:
+                results[name] = measure(available[name], people)
+            except (ValueError, MemoryError):
+                continue
+
+    reference = next(
+        (results[name][0] for name in REFERENCES if name in results), None
+    )
+    return [
+        (name, seconds, peak,
+         float("nan") if reference is None
+         else max_error(probabilities, reference))
+        for name, (probabilities, seconds, peak) in results.items()
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark heredity engines on random pedigrees."
+    )
+    parser.add_argument("--engine", choices=sorted(engines()),
+                        action="append",
+                        help="engine to run, may be repeated (default: all)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                        help="numbers of people")
+    parser.add_argument("--observed", type=float, default=0.5,
+                        help="fraction of known traits (default 0.5)")
+    parser.add_argument("--loops", type=float, default=0.0,
+                        help="chance of marrying a relative (default 0)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # References run first so that every engine can be compared to them
+    names = args.engine or list(engines())
+    names = ([name for name in REFERENCES if name in names]
+             + [name for name in names if name not in REFERENCES])
+
+    print(f"{'engine':<12} {'people':>6} {'seconds':>9} {'peak MB':>9} "
+          f"{'max error':>10}")
+    for n_people in args.sizes:
+        for name, seconds, peak, error in benchmark(
+            names, n_people, args.observed, args.loops, args.seed
+        ):
+            print(f"{name:<12} {n_people:>6} {seconds:>9.4f} "
+                  f"{peak / 2 ** 20:>9.1f} {error:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+import heapq
+
+import numpy as np
+
+from heredity import PROBS, empty_probabilities, get_from
+
+# Gene values, in the order used along every factor axis
+GENES = (0, 1, 2)
+
+# Most variables in a clique, whose table holds 3 ** MAX_CLIQUE values
+MAX_CLIQUE = 12
+
+
+class Factor():
+    """
+    Table of non-negative values over a tuple of gene variables, one axis
+    of length 3 per variable, indexed by number of gene copies.
+    """
+
+    def __init__(self, variables, table):
+        self.variables = tuple(variables)
+        self.table = np.asarray(table, dtype=np.float64)
+
+    def expand(self, variables):
+        """
+        Return the table with its axes reordered to follow `variables`,
+        and axes of length 1 for variables not in the factor.
+        """
+        order = [self.variables.index(v) for v in variables
+                 if v in self.variables]
+        shape = [3 if v in self.variables else 1 for v in variables]
+        return self.table.transpose(order).reshape(shape)
+
+    def __mul__(self, other):
+        variables = self.variables + tuple(
+            v for v in other.variables if v not in self.variables
+        )
+        return Factor(variables,
+                      self.expand(variables) * other.expand(variables))
+
+    def sum_out(self, variable):
+        """
+        Return the factor with `variable` summed out.
+        """
+        axis = self.variables.index(variable)
+        variables = self.variables[:axis] + self.variables[axis + 1:]
+        return Factor(variables, self.table.sum(axis=axis))
+
+    def project(self, variables):
+        """
+        Return the factor with every variable not in `variables` summed out.
+        """
+        axes = tuple(i for i, v in enumerate(self.variables)
+                     if v not in variables)
+        return Factor([v for v in self.variables if v in variables],
+                      self.table.sum(axis=axes))
+
+    def __truediv__(self, other):
+        """
+        Divide by a factor over a subset of this factor's variables,
+        taking 0 / 0 to be 0.
+        """
+        divisor = other.expand(self.variables)
+        table = np.divide(self.table, divisor,
+                          out=np.zeros_like(self.table),
+                          where=divisor != 0)
+        return Factor(self.variables, table)
+
+    def scaled(self):
+        """
+        Return the factor scaled so its largest value is 1.
+        """
+        largest = self.table.max()
+        return Factor(self.variables,
+                      self.table / largest if largest else self.table)
+
+
+def inheritance_table():
+    """
+    Return an array where [child, mother, father] is the probability of
+    a child having `child` copies of the gene given the parents' copies.
+    """
+    table = np.zeros((3, 3, 3))
+    for mother in GENES:
+        for father in GENES:
+            from_mother = get_from(mother, True)
+            from_father = get_from(father, True)
+            table[0, mother, father] = (1 - from_mother) * (1 - from_father)
+            table[1, mother, father] = (from_mother * (1 - from_father)
+                                        + (1 - from_mother) * from_father)
+            table[2, mother, father] = from_mother * from_father
+    return table
+
+
+def trait_table(trait):
+    """
+    Return the probability of the observed `trait` for each gene count.
+    """
+    return np.array([PROBS["trait"][gene][trait] for gene in GENES])
+
+
+def compile_network(people):
+    """
+    Compile a family into a list of factors over each person's gene
+    variable: one prior or inheritance factor per person, times the
+    likelihood of their trait when it is known. Unobserved traits are
+    summed out, contributing a factor of 1.
+    """
+    inheritance = inheritance_table()
+    prior = np.array([PROBS["gene"][gene] for gene in GENES])
+    factors = []
+    for name, person in people.items():
+        if person["mother"] is None:
+            factor = Factor((name,), prior)
+        else:
+            factor = Factor((name, person["mother"], person["father"]),
+                            inheritance)
+        if person["trait"] is not None:
+            factor = factor * Factor((name,), trait_table(person["trait"]))
+        factors.append(factor)
+    return factors
+
+
+def interaction_graph(factors, variables):
+    """
+    Return a dictionary mapping each of `variables` to the set of other
+    variables it shares a factor with.
+    """
+    neighbors = {v: set() for v in variables}
+    for factor in factors:
+        for v in factor.variables:
+            if v in neighbors:
+                neighbors[v].update(
+                    u for u in factor.variables if u != v and u in neighbors
+                )
+    return neighbors
+
+
+def elimination_order(factors, variables):
+    """
+    Return an order to eliminate `variables` in, greedily choosing the
+    variable that adds the fewest edges between its neighbors
+    (min-fill), breaking ties by fewest neighbors.
+    """
+    neighbors = interaction_graph(factors, variables)
+
+    def score(v):
+        adjacent = list(neighbors[v])
+        fill = sum(
+            1 for i, a in enumerate(adjacent) for b in adjacent[i + 1:]
+            if b not in neighbors[a]
+        )
+        return (fill, len(adjacent), v)
+
+    # Scores only change for neighbors of an eliminated variable, so stale
+    # heap entries are skipped rather than rescoring every variable
+    heap = [score(v) for v in variables]
+    heapq.heapify(heap)
+    order = []
+    eliminated = set()
+    while heap:
+        entry = heapq.heappop(heap)
+        v = entry[-1]
+        if v in eliminated or entry != score(v):
+            continue
+        for a in neighbors[v]:
+            neighbors[a].update(neighbors[v] - {a})
+            neighbors[a].discard(v)
+        for a in neighbors[v]:
+            heapq.heappush(heap, score(a))
+        eliminated.add(v)
+        order.append(v)
+    return order
+
+
+def elimination_cliques(factors, order):
+    """
+    Return a dictionary mapping each variable in `order` to its clique:
+    the variable and its neighbors not yet eliminated when it is, which
+    are the variables of the factor that eliminating it creates.
+    """
+    neighbors = interaction_graph(factors, order)
+    cliques = dict()
+    for v in order:
+        adjacent = neighbors.pop(v)
+        for a in adjacent:
+            neighbors[a].update(adjacent - {a})
+            neighbors[a].discard(v)
+        cliques[v] = {v} | adjacent
+    return cliques
+
+
+def check_cliques(cliques):
+    """
+    Raise a ValueError if any clique has more than MAX_CLIQUE variables,
+    since the dense table over it would have 3 ** size entries.
+    """
+    largest = max(map(len, cliques.values()), default=0)
+    if largest > MAX_CLIQUE:
+        raise ValueError(
+            f"elimination order has a clique of {largest} people, more "
+            f"than {MAX_CLIQUE}; use the gibbs engine for this family"
+        )
+
+
+def eliminate(factors, order):
+    """
+    Sum the variables in `order` out of the product of `factors`, one at
+    a time, multiplying only the factors that mention each variable.
+    Return the product of the factors left over, up to a constant.
+
+    Each new factor is scaled so its largest value is 1, and factors left
+    with no variables are dropped, so that large families do not
+    underflow.
+    """
+    factors = dict(enumerate(factors))
+    next_id = len(factors)
+    mentions = dict()
+    for i, factor in factors.items():
+        for v in factor.variables:
+            mentions.setdefault(v, set()).add(i)
+
+    for variable in order:
+        related = sorted(mentions.pop(variable, ()))
+        if not related:
+            continue
+        product = factors.pop(related[0])
+        for i in related[1:]:
+            product = product * factors.pop(i)
+        for v in product.variables:
+            if v != variable:
+                mentions[v].difference_update(related)
+        product = product.sum_out(variable)
+        if not product.variables:
+            continue
+        product = product.scaled()
+        factors[next_id] = product
+        for v in product.variables:
+            mentions[v].add(next_id)
+        next_id += 1
+
+    result = Factor((), 1.0)
+    for factor in factors.values():
+        result = result * factor
+    return result
+
+
+def variable_elimination(people):
+    """
+    Compute gene and trait distributions for each person by variable
+    elimination over the family's Bayesian network.
+
+    One elimination order is chosen for the whole network; the marginal
+    of each person is found by eliminating everyone else in that order.
+    A ValueError is raised if the order has a clique of more than
+    MAX_CLIQUE people, as on pedigrees with many loops.
+    """
+    factors = compile_network(people)
+    order = elimination_order(factors, list(people))
+    check_cliques(elimination_cliques(factors, order))
+    probabilities = empty_probabilities(people)
+    for name in people:
+        others = [other for other in order if other != name]
+        marginal = eliminate(factors, others)
+        set_marginal(probabilities, people, name, marginal.table)
+    return probabilities
+
+
+def set_marginal(probabilities, people, name, gene):
+    """
+    Fill in a person's normalized gene distribution from the unnormalized
+    array `gene`, and their trait distribution from it, or from their
+    known trait.
+    """
+    gene = gene / gene.sum()
+    for value in GENES:
+        probabilities[name]["gene"][value] = float(gene[value])
+    trait = people[name]["trait"]
+    if trait is None:
+        p = float(gene @ trait_table(True))
+        probabilities[name]["trait"][True] = p
+        probabilities[name]["trait"][False] = 1 - p
+    else:
+        probabilities[name]["trait"][trait] = 1
+        probabilities[name]["trait"][not trait] = 0
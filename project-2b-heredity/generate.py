@@ -0,0 +1,103 @@
+import argparse
+import csv
+import random
+
+
+def random_pedigree(n_people, observed=0.5, loops=0.0, children=(1, 4),
+                    seed=None):
+    """
+    Return a random multi-generation family of `n_people` in the format of
+    `load_data`.
+
+    The family starts from one couple of founders. Each couple has a
+    number of children drawn from the `children` range, and each child
+    then marries either an outsider, a new founder, or with probability
+    `loops` a relative of the same generation who is not their sibling,
+    which closes a loop in the pedigree. Each trait is known with
+    probability `observed`.
+    """
+    rng = random.Random(seed)
+    people = dict()
+
+    def add(mother=None, father=None):
+        name = f"Person{len(people)}"
+        people[name] = {
+            "name": name,
+            "mother": mother,
+            "father": father,
+            "trait": (rng.random() < 0.5 if rng.random() < observed
+                      else None)
+        }
+        return name
+
+    couples = []
+    while len(people) < n_people:
+        if not couples:
+            if n_people - len(people) == 1:
+                add()
+                break
+            couples = [(add(), add())]
+
+        generation = []
+        for mother, father in couples:
+            for _ in range(rng.randint(*children)):
+                if len(people) < n_people:
+                    generation.append(add(mother, father))
+
+        couples = []
+        rng.shuffle(generation)
+        unmarried = set(generation)
+        for person in generation:
+            if person not in unmarried or len(people) >= n_people:
+                continue
+            unmarried.discard(person)
+            relatives = [
+                other for other in unmarried
+                if people[other]["mother"] != people[person]["mother"]
+            ]
+            if relatives and rng.random() < loops:
+                spouse = rng.choice(sorted(relatives))
+                unmarried.discard(spouse)
+            else:
+                spouse = add()
+            couples.append((person, spouse))
+    return people
+
+
+def write_pedigree(filename, people):
+    """
+    Write a family to a CSV file in the format read by `load_data`.
+    """
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "mother", "father", "trait"])
+        for person in people.values():
+            writer.writerow([
+                person["name"],
+                person["mother"] or "",
+                person["father"] or "",
+                {True: 1, False: 0, None: ""}[person["trait"]],
+            ])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a random pedigree as a heredity CSV file."
+    )
+    parser.add_argument("people", type=int, help="number of people")
+    parser.add_argument("output", help="CSV file to write")
+    parser.add_argument("--observed", type=float, default=0.5,
+                        help="fraction of known traits (default 0.5)")
+    parser.add_argument("--loops", type=float, default=0.0,
+                        help="chance of marrying a relative (default 0)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    people = random_pedigree(args.people, args.observed, args.loops,
+                             seed=args.seed)
+    write_pedigree(args.output, people)
+    print(f"Wrote {len(people)} people")
+
+
+if __name__ == "__main__":
+    main()
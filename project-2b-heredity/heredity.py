@@ -40,12 +40,55 @@ PROBS = {
 def main():
 
     # Check for proper usage
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python heredity.py data.csv")
+    if len(sys.argv) not in (2, 3) or (
+        len(sys.argv) == 3 and sys.argv[2] not in engines()
+    ):
+        sys.exit("Usage: python heredity.py data.csv "
+                 f"[{'|'.join(engines())}]")
     people = load_data(sys.argv[1])
+    engine = engines()[sys.argv[2] if len(sys.argv) == 3 else "enumerate"]
+    try:
+        probabilities = engine(people)
+    except ValueError as e:
+        sys.exit(str(e))
 
-    # Keep track of gene and trait probabilities for each person
-    probabilities = {
+    # Print results
+    for person in people:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                print(f"    {value}: {p:.4f}")
+
+
+def engines():
+    """
+    Return a dictionary mapping the name of each inference engine to a
+    function that takes `people` and returns their normalized gene and
+    trait distributions, in the format of `empty_probabilities`.
+    """
+    from elimination import variable_elimination
+    from propagation import belief_propagation
+    from sampling import gibbs_sampling, likelihood_weighting
+    from vectorized import vectorized_probabilities
+    return {
+        "enumerate": enumerate_probabilities,
+        "brute-force": brute_force_probabilities,
+        "elimination": variable_elimination,
+        "propagation": belief_propagation,
+        "vectorized": vectorized_probabilities,
+        "weighting": likelihood_weighting,
+        "gibbs": gibbs_sampling,
+    }
+
+
+def empty_probabilities(people):
+    """
+    Return gene and trait distributions for each person with every
+    probability set to 0.
+    """
+    return {
         person: {
             "gene": {
                 2: 0,
@@ -60,6 +103,143 @@ def main():
         for person in people
     }
 
+
+def enumerate_probabilities(people):
+    """
+    Compute gene and trait distributions for each person by enumerating
+    every gene assignment with nonzero probability, as generated by
+    `gene_assignments`.
+
+    Unknown traits are summed out rather than enumerated: each assignment
+    adds its probability to a person's trait distribution in proportion to
+    the conditional probability of the trait given their genes.
+    """
+    probabilities = empty_probabilities(people)
+    order = parent_order(people)
+    for genes, p in gene_assignments(people, order):
+        for name, num_gene in zip(order, genes):
+            probabilities[name]["gene"][num_gene] += p
+            trait = people[name]["trait"]
+            if trait is None:
+                for value in (True, False):
+                    probabilities[name]["trait"][value] += (
+                        p * PROBS["trait"][num_gene][value]
+                    )
+            else:
+                probabilities[name]["trait"][trait] += p
+
+    # Ensure probabilities sum to 1
+    normalize(probabilities)
+    return probabilities
+
+
+def parent_order(people):
+    """
+    Return a list of the names in `people` with every parent before their
+    children.
+    """
+    order = []
+    placed = set()
+
+    def place(name):
+        stack = [name]
+        while stack:
+            name = stack[-1]
+            parents = [
+                parent for parent in (people[name]["mother"],
+                                      people[name]["father"])
+                if parent is not None and parent not in placed
+            ]
+            if parents:
+                stack.extend(parents)
+                continue
+            stack.pop()
+            if name not in placed:
+                placed.add(name)
+                order.append(name)
+
+    for name in people:
+        place(name)
+    return order
+
+
+def gene_assignments(people, order):
+    """
+    Generate a tuple (genes, p) for each assignment of gene counts to the
+    people in `order`, a list with parents before children, where `genes`
+    lists each person's number of copies in that order and `p` is the
+    joint probability of those genes and the known traits.
+
+    Assignments are generated depth first, so the product for the people
+    already assigned is shared by every assignment that extends it, and
+    prefixes with probability 0 are never extended. The same `genes` list
+    is reused and should be copied if kept.
+    """
+    index = {name: i for i, name in enumerate(order)}
+    parents = [
+        (None, None) if people[name]["mother"] is None else
+        (index[people[name]["mother"]], index[people[name]["father"]])
+        for name in order
+    ]
+    evidence = [
+        [1 if people[name]["trait"] is None else
+         PROBS["trait"][num_gene][people[name]["trait"]]
+         for num_gene in (0, 1, 2)]
+        for name in order
+    ]
+
+    # inheritance[mother][father][child] is the probability of the child's
+    # gene count given the parents' gene counts
+    inheritance = [
+        [
+            [(1 - get_from(mother, True)) * (1 - get_from(father, True)),
+             get_from(mother, True) * (1 - get_from(father, True))
+             + (1 - get_from(mother, True)) * get_from(father, True),
+             get_from(mother, True) * get_from(father, True)]
+            for father in (0, 1, 2)
+        ]
+        for mother in (0, 1, 2)
+    ]
+    prior = [PROBS["gene"][num_gene] for num_gene in (0, 1, 2)]
+
+    # prefix[i] is the probability of the genes chosen for order[:i]
+    n = len(order)
+    if n == 0:
+        return
+    genes = [-1] * n
+    prefix = [1] * (n + 1)
+    i = 0
+    while i >= 0:
+        genes[i] += 1
+        if genes[i] == 3:
+            genes[i] = -1
+            i -= 1
+            continue
+        mother, father = parents[i]
+        if mother is None:
+            p = prior[genes[i]]
+        else:
+            p = inheritance[genes[mother]][genes[father]][genes[i]]
+        p *= prefix[i] * evidence[i][genes[i]]
+        if p == 0:
+            continue
+        if i == n - 1:
+            yield genes, p
+        else:
+            prefix[i + 1] = p
+            i += 1
+
+
+def brute_force_probabilities(people):
+    """
+    Compute gene and trait distributions for each person by computing the
+    joint probability of every assignment of genes and traits, skipping
+    trait assignments that contradict the evidence.
+    """
+
+    # Keep track of gene and trait probabilities for each person
+    probabilities = empty_probabilities(people)
+
     # Loop over all sets of people who might have the trait
     names = set(people)
     for have_trait in powerset(names):
@@ -83,15 +263,7 @@ def main():
 
     # Ensure probabilities sum to 1
     normalize(probabilities)
-
-    # Print results
-    for person in people:
-        print(f"{person}:")
-        for field in probabilities[person]:
-            print(f"  {field.capitalize()}:")
-            for value in probabilities[person][field]:
-                p = probabilities[person][field][value]
-                print(f"    {value}: {p:.4f}")
+    return probabilities
 
 
 def load_data(filename):
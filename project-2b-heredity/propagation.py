@@ -0,0 +1,82 @@
+from elimination import (Factor, check_cliques, compile_network,
+                         elimination_cliques, elimination_order,
+                         set_marginal)
+from heredity import empty_probabilities
+
+
+def junction_tree(factors, variables):
+    """
+    Build a junction tree over `variables` from an elimination order.
+
+    Eliminating a variable v joins it with its remaining neighbors into
+    the clique of v; the clique's parent is the clique of the first of
+    those neighbors to be eliminated later. Each factor is assigned to the
+    clique of the first of its variables to be eliminated.
+
+    Return a tuple (order, cliques, parents, assigned), where `order`
+    lists the variables so that every clique comes before its parent,
+    `cliques` maps each variable to its clique, `parents` maps it to its
+    parent's variable or None for a root, and `assigned` maps it to the
+    list of factors assigned to its clique.
+    """
+    order = elimination_order(factors, variables)
+    position = {v: i for i, v in enumerate(order)}
+    cliques = elimination_cliques(factors, order)
+    parents = {
+        v: min(cliques[v] - {v}, key=position.get, default=None)
+        for v in order
+    }
+
+    assigned = {v: [] for v in order}
+    for factor in factors:
+        first = min(factor.variables, key=position.get)
+        assigned[first].append(factor)
+    return order, cliques, parents, assigned
+
+
+def belief_propagation(people):
+    """
+    Compute gene and trait distributions for each person by sum-product
+    message passing over a junction tree of the family's Bayesian network.
+
+    On a pedigree without loops every clique holds a child and their
+    parents, so both passes take time linear in the size of the family.
+    Marriages between relatives can enlarge cliques well beyond the loop
+    itself, and each clique's table grows threefold per variable, so a
+    ValueError is raised if any clique has more than MAX_CLIQUE variables.
+    """
+    factors = compile_network(people)
+    order, cliques, parents, assigned = junction_tree(factors, list(people))
+    check_cliques(cliques)
+    children = {v: [] for v in order}
+    for v in order:
+        if parents[v] is not None:
+            children[parents[v]].append(v)
+
+    # Collect messages from the leaves up to each root, keeping the product
+    # of each clique's factors and incoming messages
+    upward = dict()
+    partial = dict()
+    for v in order:
+        product = Factor((v,), [1.0, 1.0, 1.0])
+        for factor in assigned[v]:
+            product = product * factor
+        for child in children[v]:
+            product = product * upward[child]
+        partial[v] = product.scaled()
+        if parents[v] is not None:
+            upward[v] = partial[v].sum_out(v).scaled()
+
+    # Distribute messages back down, dividing out each child's own message
+    downward = dict()
+    probabilities = empty_probabilities(people)
+    for v in reversed(order):
+        belief = partial[v]
+        if parents[v] is not None:
+            belief = (belief * downward[v]).scaled()
+        for child in children[v]:
+            separator = cliques[child] - {child}
+            downward[child] = (belief.project(separator)
+                               / upward[child]).scaled()
+        set_marginal(probabilities, people, v, belief.project({v}).table)
+    return probabilities
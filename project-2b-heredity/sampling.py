@@ -0,0 +1,399 @@
+import argparse
+import sys
+
+import numpy as np
+
+from elimination import (GENES, compile_network, inheritance_table,
+                         interaction_graph, set_marginal, trait_table)
+from heredity import PROBS, empty_probabilities, load_data, parent_order
+
+# Largest 95% confidence interval half-width to stop sampling at
+TOLERANCE = 0.01
+Z_SCORE = 1.96
+
+# Likelihood weighting: particles per batch, at most BATCH_VALUES gene
+# values per batch, and the effective number of samples needed before
+# the intervals are trusted
+BATCH_SIZE = 10000
+BATCH_VALUES = 1 << 22
+MAX_SAMPLES = 10 ** 6
+MIN_EFFECTIVE = 100
+
+# Gibbs sampling: parallel chains, and sweeps between interval checks
+CHAINS = 100
+BURN_IN = 100
+MAX_SWEEPS = 10000
+CHECK_EVERY = 10
+
+
+class Pedigree():
+    """
+    Array form of a family: people are numbered in the order of `people`,
+    with -1 for the parents of founders.
+    """
+
+    def __init__(self, people):
+        self.names = list(people)
+        index = {name: i for i, name in enumerate(self.names)}
+        self.mothers = np.array([
+            -1 if people[name]["mother"] is None
+            else index[people[name]["mother"]] for name in self.names
+        ], dtype=np.intp)
+        self.fathers = np.array([
+            -1 if people[name]["father"] is None
+            else index[people[name]["father"]] for name in self.names
+        ], dtype=np.intp)
+        self.evidence = np.array([
+            np.ones(3) if people[name]["trait"] is None
+            else trait_table(people[name]["trait"])
+            for name in self.names
+        ]).reshape(len(self.names), 3)
+        self.prior = np.array([PROBS["gene"][gene] for gene in GENES])
+        self.inheritance = inheritance_table()
+
+        # Generations: founders first, then everyone whose parents are
+        # both in earlier generations
+        depth = np.zeros(len(self.names), dtype=np.intp)
+        for name in parent_order(people):
+            i = index[name]
+            if self.mothers[i] >= 0:
+                depth[i] = 1 + max(depth[self.mothers[i]],
+                                   depth[self.fathers[i]])
+        self.generations = [np.flatnonzero(depth == d)
+                            for d in range(depth.max(initial=-1) + 1)]
+
+    def forward_sample(self, rng, size):
+        """
+        Return a (size, n) array of gene counts sampled from the prior,
+        one generation at a time, ignoring the evidence.
+        """
+        genes = np.zeros((size, len(self.names)), dtype=np.int8)
+        for generation in self.generations:
+            founders = generation[self.mothers[generation] < 0]
+            children = generation[self.mothers[generation] >= 0]
+            genes[:, founders] = choose(
+                rng, np.broadcast_to(self.prior, (size, len(founders), 3))
+            )
+            probabilities = self.inheritance[
+                :, genes[:, self.mothers[children]],
+                genes[:, self.fathers[children]]
+            ]
+            genes[:, children] = choose(rng, np.moveaxis(probabilities, 0, -1))
+        return genes
+
+
+def choose(rng, probabilities):
+    """
+    Return an array with one gene count sampled from each distribution
+    along the last axis of `probabilities`, which need not be normalized.
+    """
+    cumulative = np.cumsum(probabilities, axis=-1)
+    threshold = rng.random(cumulative.shape[:-1]) * cumulative[..., -1]
+    return (threshold[..., np.newaxis] >= cumulative[..., :-1]).sum(
+        axis=-1, dtype=np.int8
+    )
+
+
+def likelihood_weighting(people, tolerance=TOLERANCE,
+                         max_samples=MAX_SAMPLES, batch_size=None,
+                         seed=None, stats=None):
+    """
+    Estimate gene and trait distributions for each person by likelihood
+    weighting: genes are sampled top-down from the prior, a batch of
+    particles at a time, and each particle is weighted by the likelihood
+    of the known traits. Unknown traits are summed out of each particle.
+
+    Sampling stops once every 95% confidence interval is within
+    `tolerance` and the effective sample size is at least MIN_EFFECTIVE,
+    or after `max_samples` particles. If `stats` is a dict, the particle
+    count, effective sample size and interval half-widths are stored in
+    it.
+
+    If the effective sample size is still below MIN_EFFECTIVE after
+    `max_samples` particles, a few particles carry almost all the weight
+    and the intervals cannot be trusted, so a ValueError is raised.
+    """
+    pedigree = Pedigree(people)
+    n_people = len(pedigree.names)
+    if batch_size is None:
+        batch_size = max(100, min(BATCH_SIZE,
+                                  BATCH_VALUES // max(n_people, 1)))
+    rng = np.random.default_rng(seed)
+    log_evidence = np.log(pedigree.evidence)
+    bins = 3 * np.arange(n_people)
+
+    # Sums of weights, squared weights, and both per gene value, all
+    # relative to exp(shift) so that small weights do not underflow
+    shift = -np.inf
+    total = total_squared = 0.0
+    weighted = np.zeros(3 * n_people)
+    squared = np.zeros(3 * n_people)
+    samples = 0
+    while samples < max_samples:
+        size = min(batch_size, max_samples - samples)
+        genes = pedigree.forward_sample(rng, size)
+        log_weights = log_evidence[np.arange(n_people), genes].sum(axis=1)
+
+        new_shift = max(shift, log_weights.max())
+        rescale = np.exp(shift - new_shift)
+        total *= rescale
+        total_squared *= rescale ** 2
+        weighted *= rescale
+        squared *= rescale ** 2
+        shift = new_shift
+
+        weights = np.exp(log_weights - shift)
+        total += weights.sum()
+        total_squared += (weights ** 2).sum()
+        keys = (bins + genes).ravel()
+        weighted += np.bincount(keys, np.repeat(weights, n_people),
+                                minlength=3 * n_people)
+        squared += np.bincount(keys, np.repeat(weights ** 2, n_people),
+                               minlength=3 * n_people)
+        samples += size
+
+        gene = (weighted / total).reshape(n_people, 3)
+        half_widths = weighting_intervals(
+            gene, squared.reshape(n_people, 3), total, total_squared
+        )
+        effective = total ** 2 / total_squared
+        if (effective >= MIN_EFFECTIVE
+                and max(np.max(w, initial=0) for w in half_widths)
+                <= tolerance):
+            break
+
+    if effective < MIN_EFFECTIVE:
+        raise ValueError(
+            f"effective sample size {effective:.1f} after {samples} "
+            f"particles is below {MIN_EFFECTIVE}; use the gibbs engine "
+            "for this family"
+        )
+    if stats is not None:
+        stats["samples"] = samples
+        stats["effective"] = float(effective)
+        stats["intervals"] = intervals(people, pedigree, *half_widths)
+    return estimates(people, pedigree, gene)
+
+
+def weighting_intervals(gene, squared, total, total_squared):
+    """
+    Return (gene, trait) arrays of 95% confidence interval half-widths for
+    self-normalized importance sampling estimates, by the delta method.
+
+    An estimate of the mean of f has variance
+    sum(w^2 (f - mean)^2) / sum(w)^2, where for a gene value f is 0 or 1,
+    and for a trait it is the trait probability given the gene.
+    """
+    trait = trait_table(True)
+    gene_variance = (squared * (1 - 2 * gene) + gene ** 2 * total_squared)
+    trait_mean = gene @ trait
+    trait_variance = (squared @ trait ** 2 - 2 * trait_mean * (squared @ trait)
+                      + trait_mean ** 2 * total_squared)
+    return (Z_SCORE * np.sqrt(np.maximum(gene_variance, 0)) / total,
+            Z_SCORE * np.sqrt(np.maximum(trait_variance, 0)) / total)
+
+
+def gibbs_sampling(people, tolerance=TOLERANCE, chains=CHAINS,
+                   burn_in=BURN_IN, max_sweeps=MAX_SWEEPS, seed=None,
+                   stats=None):
+    """
+    Estimate gene and trait distributions for each person by Gibbs
+    sampling, running `chains` independent chains side by side.
+
+    People who share no factor are conditionally independent, so the
+    family is split into such groups by greedy coloring and each sweep
+    resamples one whole group at a time across every chain. Estimates
+    average each person's full conditional distribution after `burn_in`
+    sweeps, and intervals come from the spread between chains.
+
+    Sampling stops once every 95% confidence interval is within
+    `tolerance`, checked every CHECK_EVERY sweeps, or after `max_sweeps`
+    sweeps. If `stats` is a dict, the sweep count and interval
+    half-widths are stored in it.
+    """
+    if max_sweeps <= burn_in:
+        raise ValueError("max_sweeps must be greater than burn_in")
+    pedigree = Pedigree(people)
+    n_people = len(pedigree.names)
+    rng = np.random.default_rng(seed)
+    genes = pedigree.forward_sample(rng, chains)
+    blocks = [gibbs_block(pedigree, group) for group in color(people)]
+    totals = np.zeros((chains, n_people, 3))
+
+    sweeps = 0
+    while sweeps < max_sweeps:
+        for people_index, update in blocks:
+            conditional = update(genes)
+            genes[:, people_index] = choose(rng, conditional)
+            if sweeps >= burn_in:
+                totals[:, people_index] += conditional
+        sweeps += 1
+        if sweeps > burn_in and (sweeps - burn_in) % CHECK_EVERY == 0:
+            half_widths = chain_intervals(totals)
+            if max(np.max(w, initial=0) for w in half_widths) <= tolerance:
+                break
+
+    half_widths = chain_intervals(totals)
+    if stats is not None:
+        stats["samples"] = chains * (sweeps - burn_in)
+        stats["sweeps"] = sweeps
+        stats["intervals"] = intervals(people, pedigree, *half_widths)
+    return estimates(people, pedigree, totals.sum(axis=0))
+
+
+def color(people):
+    """
+    Return a list of groups of names such that no two people in a group
+    share a factor of the family's network, coloring greedily with the
+    people who have the most neighbors first.
+    """
+    neighbors = interaction_graph(compile_network(people), list(people))
+    colors = dict()
+    for name in sorted(people, key=lambda name: -len(neighbors[name])):
+        used = {colors[other] for other in neighbors[name] if other in colors}
+        colors[name] = next(c for c in range(len(used) + 1) if c not in used)
+    groups = [[] for _ in range(max(colors.values(), default=-1) + 1)]
+    for name, c in colors.items():
+        groups[c].append(name)
+    return groups
+
+
+def gibbs_block(pedigree, group):
+    """
+    Return a tuple (people_index, update) for a group of conditionally
+    independent people, where `update(genes)` returns a (chains, k, 3)
+    array of each person's conditional gene distribution given everyone
+    else's genes in every chain.
+    """
+    index = {name: i for i, name in enumerate(pedigree.names)}
+    people_index = np.array([index[name] for name in group], dtype=np.intp)
+    position = {i: k for k, i in enumerate(people_index.tolist())}
+    founders = np.flatnonzero(pedigree.mothers[people_index] < 0)
+    children = np.flatnonzero(pedigree.mothers[people_index] >= 0)
+    log_prior = np.log(pedigree.prior)
+    log_inheritance = np.log(pedigree.inheritance)
+    log_evidence = np.log(pedigree.evidence[people_index])
+
+    # One edge per (person in the group, child of theirs), sorted by person
+    # so each person's edges can be summed with reduceat
+    edges = sorted(
+        (position[parent], child)
+        for child in range(len(pedigree.names))
+        for parent in {pedigree.mothers[child], pedigree.fathers[child]}
+        if parent in position
+    )
+    owners = np.array([k for k, _ in edges], dtype=np.intp)
+    edge_children = np.array([c for _, c in edges], dtype=np.intp)
+    starts = np.flatnonzero(np.diff(owners, prepend=-1))
+    is_mother = (pedigree.mothers[edge_children]
+                 == people_index[owners])[:, np.newaxis]
+    is_father = (pedigree.fathers[edge_children]
+                 == people_index[owners])[:, np.newaxis]
+    candidates = np.array(GENES, dtype=np.int8)
+
+    def update(genes):
+        chains = genes.shape[0]
+        log_p = np.broadcast_to(log_evidence, (chains, len(group), 3)).copy()
+        log_p[:, founders] += log_prior
+        own = people_index[children]
+        log_p[:, children] += np.moveaxis(log_inheritance[
+            :, genes[:, pedigree.mothers[own]],
+            genes[:, pedigree.fathers[own]]
+        ], 0, -1)
+
+        if edges:
+            # Each child's factor with the owner's gene set to 0, 1 and 2
+            mothers = genes[:, pedigree.mothers[edge_children], np.newaxis]
+            fathers = genes[:, pedigree.fathers[edge_children], np.newaxis]
+            values = log_inheritance[
+                genes[:, edge_children, np.newaxis],
+                np.where(is_mother, candidates, mothers),
+                np.where(is_father, candidates, fathers),
+            ]
+            log_p[:, owners[starts]] += np.add.reduceat(values, starts,
+                                                        axis=1)
+
+        p = np.exp(log_p - log_p.max(axis=-1, keepdims=True))
+        return p / p.sum(axis=-1, keepdims=True)
+
+    return people_index, update
+
+
+def chain_intervals(totals):
+    """
+    Return (gene, trait) arrays of 95% confidence interval half-widths
+    from the spread of the per-chain estimates in `totals`.
+    """
+    means = totals / totals.sum(axis=-1, keepdims=True)
+    traits = means @ trait_table(True)
+    chains = totals.shape[0]
+    return (Z_SCORE * means.std(axis=0, ddof=1) / np.sqrt(chains),
+            Z_SCORE * traits.std(axis=0, ddof=1) / np.sqrt(chains))
+
+
+def estimates(people, pedigree, gene):
+    """
+    Return normalized gene and trait distributions from an (n, 3) array of
+    unnormalized gene weights, with unknown traits summed out.
+    """
+    probabilities = empty_probabilities(people)
+    for i, name in enumerate(pedigree.names):
+        set_marginal(probabilities, people, name, gene[i])
+    return probabilities
+
+
+def intervals(people, pedigree, gene, trait):
+    """
+    Return confidence interval half-widths in the format of the
+    probabilities, with no uncertainty for known traits.
+    """
+    half_widths = dict()
+    for i, name in enumerate(pedigree.names):
+        known = people[name]["trait"] is not None
+        half_widths[name] = {
+            "gene": {value: float(gene[i, value]) for value in (2, 1, 0)},
+            "trait": {value: 0.0 if known else float(trait[i])
+                      for value in (True, False)},
+        }
+    return half_widths
+
+
+METHODS = {
+    "weighting": likelihood_weighting,
+    "gibbs": gibbs_sampling,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Estimate heredity probabilities by sampling."
+    )
+    parser.add_argument("data", help="CSV file of people")
+    parser.add_argument("--method", choices=sorted(METHODS),
+                        default="gibbs")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="largest 95%% interval half-width to stop at")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    people = load_data(args.data)
+    stats = dict()
+    try:
+        probabilities = METHODS[args.method](
+            people, tolerance=args.tolerance, seed=args.seed, stats=stats
+        )
+    except ValueError as e:
+        sys.exit(str(e))
+    print(f"{stats['samples']} samples")
+    for person in people:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                half_width = stats["intervals"][person][field][value]
+                print(f"    {value}: {p:.4f} ± {half_width:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import numpy as np
+
+from elimination import GENES, inheritance_table, set_marginal, trait_table
+from heredity import PROBS, empty_probabilities
+
+# Gene assignments to evaluate at once, bounding memory to a few MB
+CHUNK_SIZE = 1 << 16
+
+
+def gene_array(start, stop, n_people):
+    """
+    Return an integer array of shape (stop - start, n_people) whose rows
+    are the gene assignments numbered `start` to `stop`, reading each
+    assignment number in base 3 with one digit per person.
+    """
+    numbers = np.arange(start, stop, dtype=np.int64)
+    powers = 3 ** np.arange(n_people, dtype=np.int64)
+    return (numbers[:, np.newaxis] // powers % 3).astype(np.intp)
+
+
+def vectorized_probabilities(people, chunk_size=CHUNK_SIZE):
+    """
+    Compute gene and trait distributions for each person by evaluating
+    the joint probability of all 3^n gene assignments as arrays,
+    `chunk_size` assignments at a time.
+
+    Each person contributes a column of lookups into the prior or
+    inheritance table times the likelihood of their known trait, and the
+    joint probabilities are the products along each row. Gene marginals
+    are summed with `bincount`; unknown traits are summed out.
+    """
+    names = list(people)
+    n_people = len(names)
+    index = {name: i for i, name in enumerate(names)}
+    founders = [i for i, name in enumerate(names)
+                if people[name]["mother"] is None]
+    children = [i for i, name in enumerate(names)
+                if people[name]["mother"] is not None]
+    mothers = [index[people[names[i]]["mother"]] for i in children]
+    fathers = [index[people[names[i]]["father"]] for i in children]
+
+    prior = np.array([PROBS["gene"][gene] for gene in GENES])
+    inheritance = inheritance_table()
+    evidence = np.array([
+        np.ones(3) if people[name]["trait"] is None
+        else trait_table(people[name]["trait"])
+        for name in names
+    ]).reshape(n_people, 3)
+    people_index = np.arange(n_people)
+
+    totals = np.zeros(3 * n_people)
+    for start in range(0, 3 ** n_people, chunk_size):
+        genes = gene_array(start, min(start + chunk_size, 3 ** n_people),
+                           n_people)
+        factors = evidence[people_index, genes]
+        factors[:, founders] *= prior[genes[:, founders]]
+        factors[:, children] *= inheritance[
+            genes[:, children], genes[:, mothers], genes[:, fathers]
+        ]
+        joint = factors.prod(axis=1)
+
+        # Person i having g copies is bin 3 * i + g
+        bins = 3 * people_index + genes
+        totals += np.bincount(bins.ravel(),
+                              weights=np.repeat(joint, n_people),
+                              minlength=3 * n_people)
+
+    probabilities = empty_probabilities(people)
+    for i, name in enumerate(names):
+        set_marginal(probabilities, people, name, totals[3 * i:3 * i + 3])
+    return probabilities
@@ -0,0 +1,166 @@
+import argparse
+import time
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.model_selection import train_test_split
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+# Queries timed one at a time to estimate latency
+LATENCY_QUERIES = 500
+
+
+class RandomProjectionLSH(ClassifierMixin, BaseEstimator):
+    """
+    Approximate 1-nearest-neighbor classifier using random-projection
+    locality-sensitive hashing.
+
+    Each of `n_tables` hash tables keys every point by the signs of its
+    projections onto `n_bits` random directions, so nearby points tend to
+    share a key. A query is compared exactly only against the points
+    sharing its key in some table, or against every point if no table has
+    any. By default `n_bits` is chosen to leave about `bucket_size` points
+    per key.
+    """
+
+    def __init__(self, n_tables=10, n_bits=None, bucket_size=8, seed=None):
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.bucket_size = bucket_size
+        self.seed = seed
+
+    def fit(self, evidence, labels):
+        evidence = np.asarray(evidence, dtype=np.float64)
+        rng = np.random.default_rng(self.seed)
+        self.points_ = evidence
+        self.labels_ = np.asarray(labels)
+        self.center_ = evidence.mean(axis=0)
+        self.bits_ = self.n_bits or max(
+            1, int(np.log2(max(len(evidence) / self.bucket_size, 1)))
+        )
+        self.directions_ = rng.standard_normal(
+            (evidence.shape[1], self.n_tables * self.bits_)
+        )
+
+        # Each table is its points sorted by key, for lookup by searchsorted
+        keys = self.keys(evidence)
+        self.order_ = np.argsort(keys, axis=0, kind="stable")
+        self.sorted_keys_ = np.take_along_axis(keys, self.order_, axis=0)
+        return self
+
+    def keys(self, evidence):
+        """
+        Return an (n, n_tables) array of each row's key in each table.
+        """
+        bits = (evidence - self.center_) @ self.directions_ > 0
+        bits = bits.reshape(len(evidence), self.n_tables, self.bits_)
+        return bits @ (1 << np.arange(self.bits_))
+
+    def predict(self, evidence):
+        evidence = np.asarray(evidence, dtype=np.float64)
+        keys = self.keys(evidence)
+        starts = np.empty_like(keys)
+        stops = np.empty_like(keys)
+        for table in range(self.n_tables):
+            starts[:, table] = np.searchsorted(
+                self.sorted_keys_[:, table], keys[:, table], side="left")
+            stops[:, table] = np.searchsorted(
+                self.sorted_keys_[:, table], keys[:, table], side="right")
+
+        predictions = np.empty(len(evidence), dtype=self.labels_.dtype)
+        for i, query in enumerate(evidence):
+            candidates = np.concatenate([
+                self.order_[starts[i, table]:stops[i, table], table]
+                for table in range(self.n_tables)
+            ])
+            if not candidates.size:
+                candidates = np.arange(len(self.points_))
+            distances = ((self.points_[candidates] - query) ** 2).sum(axis=1)
+            predictions[i] = self.labels_[candidates[distances.argmin()]]
+        return predictions
+
+
+BACKENDS = {
+    "brute": lambda: KNeighborsClassifier(n_neighbors=1),
+    "kd-tree": lambda: make_pipeline(
+        StandardScaler(),
+        KNeighborsClassifier(n_neighbors=1, algorithm="kd_tree")),
+    "ball-tree": lambda: make_pipeline(
+        StandardScaler(),
+        KNeighborsClassifier(n_neighbors=1, algorithm="ball_tree")),
+    "lsh": lambda: make_pipeline(StandardScaler(), RandomProjectionLSH()),
+}
+
+
+def compare(backend, X_train, X_test, y_train, y_test, reference):
+    """
+    Fit `backend` and predict the test set, returning a dict with the fit
+    time, median and 99th percentile single-query latency in seconds,
+    batch throughput in queries per second, sensitivity, specificity, and
+    the fraction of predictions that agree with `reference`.
+    """
+    from shopping import evaluate
+
+    start = time.perf_counter()
+    model = BACKENDS[backend]().fit(X_train, y_train)
+    fit = time.perf_counter() - start
+
+    latencies = []
+    for query in X_test[:LATENCY_QUERIES]:
+        start = time.perf_counter()
+        model.predict(query[np.newaxis])
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    predictions = model.predict(X_test)
+    elapsed = time.perf_counter() - start
+
+    sensitivity, specificity = evaluate(y_test, predictions)
+    return {
+        "fit": fit,
+        "p50": float(np.percentile(latencies, 50)),
+        "p99": float(np.percentile(latencies, 99)),
+        "throughput": len(X_test) / elapsed,
+        "sensitivity": sensitivity,
+        "specificity": specificity,
+        "agreement": float((predictions == reference).mean()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare nearest-neighbor backends on shopping data."
+    )
+    parser.add_argument("data", help="CSV file of sessions")
+    parser.add_argument("--backend", choices=sorted(BACKENDS),
+                        action="append",
+                        help="backend to run, may be repeated (default: all)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    # Imported here since shopping imports BACKENDS from this module
+    from shopping import TEST_SIZE, load_data
+    evidence, labels = load_data(args.data)
+    X_train, X_test, y_train, y_test = train_test_split(
+        evidence, labels, test_size=TEST_SIZE, random_state=args.seed
+    )
+
+    # Exact 1-NN on standardized features, as used by the tree backends
+    reference = BACKENDS["kd-tree"]().fit(X_train, y_train).predict(X_test)
+
+    print(f"{'backend':<10} {'fit s':>7} {'p50 ms':>7} {'p99 ms':>7} "
+          f"{'queries/s':>10} {'TPR':>7} {'TNR':>7} {'agree':>7}")
+    for backend in args.backend or BACKENDS:
+        result = compare(backend, X_train, X_test, y_train, y_test, reference)
+        print(f"{backend:<10} {result['fit']:>7.3f} "
+              f"{1000 * result['p50']:>7.3f} {1000 * result['p99']:>7.3f} "
+              f"{result['throughput']:>10.0f} "
+              f"{100 * result['sensitivity']:>6.2f}% "
+              f"{100 * result['specificity']:>6.2f}% "
+              f"{100 * result['agreement']:>6.2f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import argparse
+import collections
+import io
+import pickle
+import queue
+import socketserver
+import sys
+import threading
+import time
+
+import numpy as np
+
+from neighbors import BACKENDS
+from shopping import EVIDENCE, load_data, row_parser, train_model
+
+# Most rows scored together, and seconds to wait for more rows to arrive
+# once a batch has started; with no wait, a batch is whatever rows are
+# already queued, so batches only grow under load
+BATCH_SIZE = 64
+BATCH_WAIT = 0
+
+# Latencies kept for percentiles, and seconds between reports
+WINDOW = 10000
+REPORT_EVERY = 10
+
+
+class Latencies():
+    """
+    Thread-safe record of the most recent per-row scoring latencies.
+    """
+
+    def __init__(self, window=WINDOW):
+        self.recent = collections.deque(maxlen=window)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def add(self, latencies):
+        with self.lock:
+            self.recent.extend(latencies)
+            self.count += len(latencies)
+
+    def report(self):
+        """
+        Return a line with the number of rows scored and the p50 and p99
+        latencies over the recent window, in milliseconds.
+        """
+        with self.lock:
+            if not self.recent:
+                return f"{self.count} rows"
+            p50, p99 = np.percentile(self.recent, [50, 99])
+            return (f"{self.count} rows, p50 {1000 * p50:.3f} ms, "
+                    f"p99 {1000 * p99:.3f} ms")
+
+
+def save_model(filename, model):
+    with open(filename, "wb") as f:
+        pickle.dump(model, f)
+
+
+def load_model(filename):
+    with open(filename, "rb") as f:
+        return pickle.load(f)
+
+
+def read_lines(stream, lines):
+    """
+    Put each line of `stream` on the queue `lines` with its arrival time,
+    followed by None at the end of the stream.
+    """
+    for line in stream:
+        lines.put((time.perf_counter(), line))
+    lines.put(None)
+
+
+def micro_batches(lines, batch_size=BATCH_SIZE, wait=BATCH_WAIT):
+    """
+    Generate lists of (arrival time, line) tuples from the queue `lines`,
+    waiting for the first line of each batch, then taking more until the
+    batch has `batch_size` lines or `wait` seconds have passed.
+    """
+    while True:
+        item = lines.get()
+        if item is None:
+            return
+        batch = [item]
+        deadline = time.perf_counter() + wait
+        while len(batch) < batch_size:
+            try:
+                item = lines.get(timeout=max(deadline - time.perf_counter(),
+                                             0))
+            except queue.Empty:
+                break
+            if item is None:
+                yield batch
+                return
+            batch.append(item)
+        yield batch
+
+
+def score(model, stream, output, latencies, batch_size=BATCH_SIZE,
+          wait=BATCH_WAIT):
+    """
+    Score the session rows of `stream`, a CSV header line followed by one
+    line per session, writing a line with each prediction to `output` in
+    order, or a line starting with "error" for rows that are blank or
+    cannot be parsed.
+
+    Rows are read by a separate thread and scored in micro-batches, and
+    the time from reading each row to writing its prediction is added to
+    `latencies`.
+    """
+    header = stream.readline()
+    try:
+        parse = row_parser(header, EVIDENCE)
+    except (ValueError, StopIteration):
+        output.write("error: expected a CSV header\n")
+        output.flush()
+        return
+
+    lines = queue.Queue()
+    threading.Thread(target=read_lines, args=(stream, lines),
+                     daemon=True).start()
+    for batch in micro_batches(lines, batch_size, wait):
+        rows = [line for _, line in batch]
+        try:
+            # The parser skips blank rows, which would misalign the output
+            if not all(row.strip() for row in rows):
+                raise ValueError("blank row")
+            evidence = parse(rows)
+            if len(evidence) != len(rows):
+                raise ValueError("rows skipped by the parser")
+            results = [str(p) for p in model.predict(evidence)]
+        except ValueError:
+            # Score rows one at a time to find the ones that do not parse,
+            # keeping one output line per input row
+            results = []
+            for row in rows:
+                try:
+                    if not row.strip():
+                        raise ValueError("blank row")
+                    results.append(str(model.predict(parse([row]))[0]))
+                except ValueError as e:
+                    results.append(f"error: {e}")
+        output.write("".join(result + "\n" for result in results))
+        output.flush()
+        done = time.perf_counter()
+        latencies.add([done - arrival for arrival, _ in batch])
+
+
+def report_periodically(latencies, every=REPORT_EVERY):
+    while True:
+        time.sleep(every)
+        print(latencies.report(), file=sys.stderr, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Train and serve a shopping prediction model."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train = commands.add_parser("train", help="fit and save a model")
+    train.add_argument("data", help="CSV file of sessions")
+    train.add_argument("model", help="file to save the model to")
+    train.add_argument("--backend", choices=sorted(BACKENDS),
+                       default="brute")
+
+    serve = commands.add_parser(
+        "serve", help="score CSV rows from stdin, or from TCP clients"
+    )
+    serve.add_argument("model", help="file of a saved model")
+    serve.add_argument("--port", type=int, default=None,
+                       help="listen on this port instead of reading stdin")
+    serve.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    serve.add_argument("--wait", type=float, default=BATCH_WAIT,
+                       help="seconds to wait for a batch to fill")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        evidence, labels = load_data(args.data)
+        save_model(args.model, train_model(evidence, labels, args.backend))
+        print(f"Saved {args.backend} model trained on {len(labels)} sessions")
+        return
+
+    model = load_model(args.model)
+    latencies = Latencies()
+    threading.Thread(target=report_periodically, args=(latencies,),
+                     daemon=True).start()
+
+    if args.port is None:
+        score(model, sys.stdin, sys.stdout, latencies, args.batch_size,
+              args.wait)
+        print(latencies.report(), file=sys.stderr)
+        return
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            score(model, io.TextIOWrapper(self.rfile),
+                  io.TextIOWrapper(self.wfile, write_through=True),
+                  latencies, args.batch_size, args.wait)
+
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    with socketserver.ThreadingTCPServer(("", args.port), Handler) as server:
+        print(f"Listening on port {args.port}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print(latencies.report(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,51 @@
 import csv
+import hashlib
+import os
 import sys
 
+import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.neighbors import KNeighborsClassifier
+
+from neighbors import BACKENDS
 
 TEST_SIZE = 0.4
 
+# Bytes of rows to convert at a time
+CHUNK_SIZE = 1 << 24
+
+# Evidence columns, in order
+EVIDENCE = [
+    "Administrative", "Administrative_Duration", "Informational",
+    "Informational_Duration", "ProductRelated", "ProductRelated_Duration",
+    "BounceRates", "ExitRates", "PageValues", "SpecialDay", "Month",
+    "OperatingSystems", "Browser", "Region", "TrafficType", "VisitorType",
+    "Weekend",
+]
+
+# Month names as they appear in the data, from January to December
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "June",
+          "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# Other text columns, each encoded as 1 if equal to its value here, else 0
+FLAGS = {
+    "VisitorType": "Returning_Visitor",
+    "Weekend": "TRUE",
+    "Revenue": "TRUE",
+}
+
+# Characters read from a text field, one more than the longest known value
+# so that longer values never match one when cut short
+TEXT_WIDTH = max(map(len, MONTHS + list(FLAGS.values()))) + 1
+
 
 def main():
 
     # Check command-line arguments
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python shopping.py data")
+    if len(sys.argv) not in (2, 3) or (
+        len(sys.argv) == 3 and sys.argv[2] not in BACKENDS
+    ):
+        sys.exit(f"Usage: python shopping.py data [{'|'.join(BACKENDS)}]")
+    backend = sys.argv[2] if len(sys.argv) == 3 else "brute"
 
     # Load data from spreadsheet and split into train and test sets
     evidence, labels = load_data(sys.argv[1])
@@ -20,7 +54,7 @@ def main():
     )
 
     # Train model and make predictions
-    model = train_model(X_train, y_train)
+    model = train_model(X_train, y_train, backend)
     predictions = model.predict(X_test)
     sensitivity, specificity = evaluate(y_test, predictions)
 
@@ -31,13 +65,14 @@ def main():
     print(f"True Negative Rate: {100 * specificity:.2f}%")
 
 
-def load_data(filename):
+def load_data(filename, chunk_size=CHUNK_SIZE, cache=None):
     """
-    Load shopping data from a CSV file `filename` and convert into a list of
-    evidence lists and a list of labels. Return a tuple (evidence, labels).
+    Load shopping data from a CSV file `filename` and convert into a matrix
+    of evidence and an array of labels. Return a tuple (evidence, labels).
 
-    evidence should be a list of lists, where each list contains the
-    following values, in order:
+    evidence is a float64 array with one row per session, where each row
+    contains the following values, in order, with integers stored as
+    whole-number floats:
         - Administrative, an integer
         - Administrative_Duration, a floating point number
         - Informational, an integer
@@ -56,43 +91,124 @@ def load_data(filename):
         - VisitorType, an integer 0 (not returning) or 1 (returning)
         - Weekend, an integer 0 (if false) or 1 (if true)
 
-    labels should be the corresponding list of labels, where each label
-    is 1 if Revenue is true, and 0 otherwise.
+    labels is the corresponding integer array of labels, where each
+    label is 1 if Revenue is true, and 0 otherwise.
+
+    The file is read `chunk_size` bytes at a time. If `cache` is a
+    directory, the arrays are saved there in a file named after the hash
+    of the CSV contents, and loaded from it when the same data is read
+    again.
     """
+    if cache is not None:
+        path = os.path.join(cache, file_hash(filename) + ".npz")
+        if os.path.exists(path):
+            with np.load(path) as data:
+                return data["evidence"], data["labels"]
+
     evidence = []
     labels = []
-    float_fields = ['Administrative_Duration', 'Informational_Duration', 'ProductRelated_Duration', 'BounceRates', 'ExitRates', 'PageValues', 'SpecialDay']
-    int_fields = ['Administrative', 'Informational', 'ProductRelated', 'OperatingSystems', 'Browser', 'Region', 'TrafficType']
-    dict_months = {
-        'Jan': 0, 'Feb': 1, 'Mar': 2, 'Apr': 3, 'May': 4, 'June': 5,
-        'Jul': 6, 'Aug': 7, 'Sep': 8, 'Oct': 9, 'Nov': 10, 'Dec': 11
-    }
+    for chunk_evidence, chunk_labels in load_chunks(filename, chunk_size):
+        evidence.append(chunk_evidence)
+        labels.append(chunk_labels)
+    evidence = np.concatenate(evidence) if evidence else np.empty((0, 17))
+    labels = (np.concatenate(labels) if labels
+              else np.empty(0, dtype=np.int64))
+
+    if cache is not None:
+        os.makedirs(cache, exist_ok=True)
+        np.savez(path, evidence=evidence, labels=labels)
+    return (evidence, labels)
+
+
+def load_chunks(filename, chunk_size=CHUNK_SIZE):
+    """
+    Generate a tuple (evidence, labels) of arrays in the format of
+    `load_data` for each chunk of about `chunk_size` bytes of rows of the
+    CSV file `filename`, so that files larger than memory can be read.
+
+    Columns are found by name from the header, and rows are parsed by
+    NumPy's loadtxt, with the text columns encoded by array operations.
+    """
     with open(filename) as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # convert data types
-            for field in float_fields:
-                row[field] = float(row[field])
-            for field in int_fields:
-                row[field] = int(row[field])   
-            row['Month'] = dict_months[row['Month']]
-            row['VisitorType'] = 1 if row['VisitorType']=="Returning_Visitor" else 0
-            row['Weekend'] = 1 if row['Weekend']=="TRUE" else 0
-            row['Revenue'] = 1 if row['Revenue']=="TRUE" else 0
-            
-            # add to return list
-            evidence.append(list(row.values())[:17])
-            labels.append(row['Revenue'])
+        parse = row_parser(f.readline(), EVIDENCE + ["Revenue"])
+        while True:
+            lines = f.readlines(chunk_size)
+            if not lines:
+                break
+            data = parse(lines)
+            yield data[:, :-1], data[:, -1].astype(np.int64)
 
-    return (evidence, labels)
 
-def train_model(evidence, labels):
+def row_parser(header, names):
+    """
+    Given the header line of a CSV file, return a function that parses a
+    list of its row lines into a float array with the columns `names`,
+    in order, encoding the text columns as in `load_data`. Lines starting
+    with "#" are parsed as rows, but blank lines are skipped.
+
+    Each list is read in one pass of NumPy's loadtxt into a record array,
+    with the text columns as strings, which are then encoded by comparing
+    them with the known values.
+    """
+    header = next(csv.reader([header]))
+    missing = set(names) - set(header)
+    if missing:
+        raise ValueError(f"missing columns {', '.join(sorted(missing))}")
+    columns = {name: i for i, name in enumerate(header)}
+    usecols = [columns[name] for name in names]
+    dtype = np.dtype([
+        (name, f"U{TEXT_WIDTH}" if name == "Month" or name in FLAGS
+         else np.float64)
+        for name in names
+    ])
+
+    # Month names in sorted order for searchsorted, and their indices
+    months = np.array(sorted(MONTHS))
+    month_indices = np.argsort(MONTHS)
+
+    def parse(lines):
+        rows = np.loadtxt(lines, delimiter=",", comments=None,
+                          usecols=usecols, dtype=dtype, ndmin=1)
+        data = np.empty((len(rows), len(names)))
+        for i, name in enumerate(names):
+            if name == "Month":
+                found = np.minimum(np.searchsorted(months, rows[name]),
+                                   len(months) - 1)
+                unknown = months[found] != rows[name]
+                if unknown.any():
+                    month = str(rows[name][unknown][0])
+                    raise ValueError(f"unknown month {month!r}")
+                data[:, i] = month_indices[found]
+            elif name in FLAGS:
+                data[:, i] = rows[name] == FLAGS[name]
+            else:
+                data[:, i] = rows[name]
+        return data
+
+    return parse
+
+
+def file_hash(filename):
+    """
+    Return the SHA-256 hex digest of the contents of `filename`.
+    """
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def train_model(evidence, labels, backend="brute"):
     """
     Given a list of evidence lists and a list of labels, return a
     fitted k-nearest neighbor model (k=1) trained on the data.
+
+    `backend` names one of the nearest-neighbor searches in
+    `neighbors.BACKENDS`; the default searches exhaustively on the raw
+    features.
     """
-    # raise NotImplementedError
-    model = KNeighborsClassifier(n_neighbors=1)
+    model = BACKENDS[backend]()
     model = model.fit(evidence, labels)
 
     return model
@@ -113,9 +229,10 @@ def evaluate(labels, predictions):
     representing the "true negative rate": the proportion of
     actual negative labels that were accurately identified.
     """
-    
-    sensitivity = sum([label==1 and label==pred for label, pred in zip(labels, predictions)])/labels.count(1)
-    specificity = sum([label==0 and label==pred for label, pred in zip(labels, predictions)])/labels.count(0)
+    labels = np.asarray(labels)
+    predictions = np.asarray(predictions)
+    sensitivity = float((predictions[labels == 1] == 1).mean())
+    specificity = float((predictions[labels == 0] == 0).mean())
 
     return (sensitivity, specificity)
 